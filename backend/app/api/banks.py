@@ -1,54 +1,39 @@
-from fastapi import APIRouter
-from typing import List, Dict
-import json
-from pathlib import Path
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+from typing import List, Dict, Tuple
+
+from modules.async_data import get_async_reader, run_blocking
+from modules.bank_aliases import get_bank_index
+from modules.catalog import FILE_PRODUCT_TYPES, get_catalog
+from modules.validator import DataValidator
 
 router = APIRouter()
 
+# Catalog version -> computed bank list
+_available_banks_cache: Dict[str, Dict[str, any]] = {}
+# (catalog version, product type) -> completeness summary
+_completeness_cache: Dict[Tuple[str, str], Dict[str, any]] = {}
+
 
 def get_available_banks() -> Dict[str, any]:
     """
-    Get list of available banks from config files.
+    Get list of available banks from the product catalog.
     Returns dict with banks categorized by product type.
     """
-    bank_data_path = Path(__file__).parent.parent.parent / "configs" / "bank_data"
+    catalog = get_catalog()
+    bank_index = get_bank_index()
     
+    # Single-bank and comparison files are already merged in the catalog index
     banks_by_product = {
-        "debit": set(),
-        "credit": set()
+        "debit": {bank_index.display_name(b) for b in catalog.get_banks("debit_card")},
+        "credit": {bank_index.display_name(b) for b in catalog.get_banks("credit_card")}
     }
     
-    all_banks = set()
-    
-    # Check if directory exists
-    if bank_data_path.exists():
-        # Parse config files to extract bank names
-        for file in bank_data_path.glob("*.json"):
-            try:
-                with open(file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    
-                    # Handle different file structures
-                    if "Сбербанк" in data:
-                        # Multi-bank comparison file
-                        for bank_key in data.keys():
-                            all_banks.add(bank_key)
-                    elif "bank" in data:
-                        # Single bank file
-                        bank_name = data["bank"]
-                        all_banks.add(bank_name)
-                        
-                        if "debit" in file.name.lower():
-                            banks_by_product["debit"].add(bank_name)
-                        elif "credit" in file.name.lower():
-                            banks_by_product["credit"].add(bank_name)
-            except Exception as e:
-                continue
+    all_banks = banks_by_product["debit"] | banks_by_product["credit"]
     
     # Default banks if nothing found
     if not all_banks:
-        all_banks = {"Сбербанк", "ВТБ", "Альфа-Банк", "Т-Банк", "Газпромбанк", 
-                     "Локо-Банк", "МТС Банк", "Райффайзенбанк"}
+        all_banks = set(bank_index.display_names())
         banks_by_product = {
             "debit": all_banks.copy(),
             "credit": all_banks.copy()
@@ -70,10 +55,94 @@ def get_available_banks() -> Dict[str, any]:
     }
 
 
+def get_cached_available_banks() -> Tuple[str, Dict[str, any]]:
+    """
+    Get bank list together with its ETag.
+    The list is rebuilt only when the catalog version changes;
+    the caller refreshes the catalog first.
+    """
+    version = get_catalog().version
+
+    banks = _available_banks_cache.get(version)
+    if banks is None:
+        banks = get_available_banks()
+        _available_banks_cache.clear()
+        _available_banks_cache[version] = banks
+
+    return f'"{version}"', banks
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates or "*" in candidates
+
+
 @router.get("/available")
-async def get_banks():
+async def get_banks(request: Request):
     """
     Returns list of available banks for dropdown lists.
     Categorized by product type.
+    Supports conditional requests: unchanged data is answered with 304.
+    """
+    await get_async_reader().refresh_catalog()
+    etag, banks = await run_blocking(get_cached_available_banks)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    return JSONResponse(content=banks, headers=headers)
+
+
+def get_completeness(product_type: str) -> Dict[str, any]:
+    """
+    Get data completeness of all banks for one product type.
+    Computed once per catalog version; the caller refreshes the catalog first.
+    """
+    catalog = get_catalog()
+    key = (catalog.version, product_type)
+
+    summary = _completeness_cache.get(key)
+    if summary is None:
+        cards_by_bank = {}
+        for record in catalog.iter_records(product_type):
+            cards_by_bank.setdefault(record.bank, []).append(record.card)
+
+        matrix = DataValidator().get_completeness_matrix(cards_by_bank, product_type)
+        bank_index = get_bank_index()
+        summary = {
+            "product_type": product_type,
+            "fields": matrix["fields"],
+            "banks": [bank_index.display_name(bank) for bank in matrix["banks"]],
+            "presence": matrix["presence"].tolist(),
+            "by_bank": {
+                bank_index.display_name(bank): round(score, 3)
+                for bank, score in matrix["by_bank"].items()
+            },
+            "by_field": {field: round(score, 3) for field, score in matrix["by_field"].items()},
+            "overall": round(matrix["overall"], 3),
+        }
+        if len(_completeness_cache) >= 16:
+            _completeness_cache.clear()
+        _completeness_cache[key] = summary
+
+    return summary
+
+
+@router.get("/completeness")
+async def get_banks_completeness(product_type: str = "credit_card"):
+    """
+    Returns data completeness per bank, per schema field and overall
+    for one product type (credit_card, debit_card).
     """
-    return get_available_banks()
+    product_types = sorted(set(FILE_PRODUCT_TYPES.values()))
+    if product_type not in product_types:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown product type: {product_type}. Expected one of: {', '.join(product_types)}"
+        )
+    await get_async_reader().refresh_catalog()
+    return await run_blocking(get_completeness, product_type)
@@ -0,0 +1,166 @@
+import math
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from modules.async_data import get_async_reader, run_blocking
+from modules.bank_aliases import get_bank_index
+from modules.catalog import FILE_PRODUCT_TYPES, get_catalog
+from modules.export_pipeline import iter_ndjson, iter_normalized_products
+from modules.ranking_index import get_ranked_parameters, get_ranking_index
+from modules.rule_engine import build_market_matrix
+
+router = APIRouter()
+
+
+def _check_product_type(product_type: Optional[str]):
+    product_types = sorted(set(FILE_PRODUCT_TYPES.values()))
+    if product_type is not None and product_type not in product_types:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown product type: {product_type}. Expected one of: {', '.join(product_types)}"
+        )
+
+
+def _json_number(value: float) -> Optional[float]:
+    return None if math.isnan(value) else round(float(value), 4)
+
+
+@router.get("/export")
+async def export_products(product_type: Optional[str] = None, valid_only: bool = False):
+    """
+    Streams the whole normalized market as NDJSON, one card per line.
+    Records are read, validated and normalized lazily, so memory stays bounded.
+    """
+    _check_product_type(product_type)
+
+    # Pick up changed data files first, so the export and its ETag are current
+    catalog = await get_async_reader().get_catalog()
+    rows = iter_normalized_products(product_type, valid_only, catalog)
+    # Sync iterator: Starlette runs it in the threadpool, off the event loop
+    return StreamingResponse(
+        iter_ndjson(rows),
+        media_type="application/x-ndjson",
+        headers={"ETag": f'"{catalog.version}"'},
+    )
+
+
+def get_market_matrix(product_type: str) -> Dict[str, Any]:
+    """All-vs-all matrix in JSON form, NaN (no data) becomes null"""
+    catalog = get_catalog()
+    matrix = build_market_matrix(product_type, catalog)
+    bank_index = get_bank_index()
+
+    return {
+        "product_type": product_type,
+        "catalog_version": catalog.version,
+        "banks": [bank_index.display_name(bank) for bank in matrix["banks"]],
+        "parameters": [
+            {
+                "field": rule.field,
+                "label": rule.label,
+                "better": "lower" if rule.direction < 0 else "higher",
+            }
+            for rule in matrix["rules"]
+        ],
+        "values": [[_json_number(v) for v in row] for row in matrix["values"]],
+        "advantage": {
+            rule.field: [[_json_number(v) for v in row] for row in matrix["advantage"][idx]]
+            for idx, rule in enumerate(matrix["rules"])
+        },
+        "wins": matrix["wins"].tolist(),
+    }
+
+
+@router.get("/matrix")
+async def market_matrix(product_type: str = "credit_card"):
+    """
+    Every bank against every bank for one product type.
+    advantage[parameter][i][j] > 0 means bank i is better than bank j;
+    wins[i][j] counts parameters where bank i is better.
+    """
+    _check_product_type(product_type)
+    await get_async_reader().refresh_catalog()
+    return await run_blocking(get_market_matrix, product_type)
+
+
+def get_top_products(
+    product_type: str,
+    parameter: str,
+    k: int,
+    min_value: Optional[float],
+    max_value: Optional[float]
+) -> Dict[str, Any]:
+    """Top-k cards of the ranking index in JSON form"""
+    index = get_ranking_index()
+    rule = get_ranked_parameters(product_type)[parameter]
+    cards = index.query(product_type, parameter, k, min_value, max_value)
+    bank_index = get_bank_index()
+
+    return {
+        "product_type": product_type,
+        "parameter": parameter,
+        "label": rule.label,
+        "better": "lower" if rule.direction < 0 else "higher",
+        "catalog_version": index.version,
+        "items": [
+            {
+                "rank": position,
+                "bank": bank_index.display_name(card.bank),
+                "bank_id": card.bank,
+                "product_name": card.card,
+                "value": card.value,
+                "display": card.display,
+                "source": card.source,
+            }
+            for position, card in enumerate(cards, start=1)
+        ],
+    }
+
+
+@router.get("/top")
+async def top_products(
+    parameter: str,
+    product_type: str = "credit_card",
+    k: int = Query(10, ge=1, le=100),
+    min_value: Optional[float] = None,
+    max_value: Optional[float] = None
+):
+    """
+    Best cards of the whole market by one parameter, best first:
+    lowest rate, longest grace period, cheapest service, highest cashback.
+    min_value/max_value restrict the ranking to a value range.
+    """
+    _check_product_type(product_type)
+    parameters = get_ranked_parameters(product_type)
+    if parameter not in parameters:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown parameter: {parameter}. Expected one of: {', '.join(parameters)}"
+        )
+    return await run_blocking(get_top_products, product_type, parameter, k, min_value, max_value)
+
+
+@router.get("/{product_type}/{bank}")
+async def get_bank_product(product_type: str, bank: str, card: Optional[str] = None):
+    """
+    Raw product data of one bank (any spelling of the bank name),
+    or a single card of it when card is given.
+    """
+    _check_product_type(product_type)
+    bank_id = get_bank_index().resolve(bank)
+    if bank_id is None:
+        raise HTTPException(status_code=404, detail=f"Unknown bank: {bank}")
+
+    reader = get_async_reader()
+    catalog = await reader.get_catalog()
+    if card is not None:
+        data = await reader.get_card(bank_id, product_type, card)
+    elif catalog.get_product(bank_id, product_type) is not None:
+        data = await reader.get_product_data(bank_id, product_type)
+    else:
+        data = None
+    if data is None:
+        raise HTTPException(status_code=404, detail=f"No {product_type} data for {bank}")
+    return data
@@ -2,7 +2,10 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import get_settings
-from app.api import urgent, trends, banks
+from app.api import urgent, trends, banks, products
+from modules.async_data import shutdown_executor
+from modules.catalog import get_catalog
+from modules.llm_cache import get_llm_cache
 
 
 settings = get_settings()
@@ -23,11 +26,29 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+async def load_product_catalog():
+    # Parse all bank data files once, before the first request
+    get_catalog()
+
+
+@app.on_event("shutdown")
+async def stop_blocking_pool():
+    shutdown_executor()
+
+
 @app.get("/health")
 async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/health/llm-cache")
+async def llm_cache_stats():
+    # Hit rate of cached model answers
+    return get_llm_cache().stats()
+
+
 app.include_router(urgent.router, prefix="/api/urgent", tags=["urgent"])
 app.include_router(trends.router, prefix="/api/trends", tags=["trends"])
 app.include_router(banks.router, prefix="/api/banks", tags=["banks"])
+app.include_router(products.router, prefix="/api/products", tags=["products"])
@@ -0,0 +1,13 @@
+import logging
+
+from modules.catalog import build_manifest
+
+
+def main():
+    # Пересобирает configs/bank_data/manifest.json (шарды, их хеши и типы продуктов)
+    logging.basicConfig(level=logging.INFO)
+    build_manifest()
+
+
+if __name__ == "__main__":
+    main()
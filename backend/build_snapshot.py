@@ -0,0 +1,13 @@
+import logging
+
+from modules.catalog import build_snapshot
+
+
+def main():
+    # Компилирует configs/bank_data/*.json в один снапшот для быстрого старта воркеров
+    logging.basicConfig(level=logging.INFO)
+    build_snapshot()
+
+
+if __name__ == "__main__":
+    main()
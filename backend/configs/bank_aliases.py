@@ -0,0 +1,40 @@
+"""
+configs/bank_aliases.py - Bank identifiers and their known spellings
+
+Canonical ids match the bank part of data file names ("4_vtb_credit.json").
+"""
+
+BANK_ALIASES = {
+    "sberbank": {
+        "display_name": "Сбербанк",
+        "aliases": ["Сбер", "Сбербанк", "Сбербанк России", "ПАО Сбербанк", "Sber", "Sberbank"],
+    },
+    "vtb": {
+        "display_name": "ВТБ",
+        "aliases": ["ВТБ", "Банк ВТБ", "ВТБ Банк", "VTB"],
+    },
+    "alfabank": {
+        "display_name": "Альфа-Банк",
+        "aliases": ["Альфа", "Альфа-Банк", "Альфабанк", "Alfa", "Alfa-Bank", "Alfabank"],
+    },
+    "tbank": {
+        "display_name": "Т-Банк",
+        "aliases": ["Т-Банк", "Т-Банк (Tinkoff)", "Тинькофф", "Тинькофф Банк", "Tinkoff", "T-Bank"],
+    },
+    "gazprom": {
+        "display_name": "Газпромбанк",
+        "aliases": ["Газпром", "Газпромбанк", "ГПБ", "Gazprombank"],
+    },
+    "loko": {
+        "display_name": "Локо-Банк",
+        "aliases": ["Локо", "Локо-Банк", "Локобанк", "Loko", "Lockobank"],
+    },
+    "mts": {
+        "display_name": "МТС Банк",
+        "aliases": ["МТС", "МТС Банк", "MTS", "MTS Bank"],
+    },
+    "raif": {
+        "display_name": "Райффайзенбанк",
+        "aliases": ["Райф", "Райффайзен", "Райффайзенбанк", "Raiffeisen", "Raiffeisenbank"],
+    },
+}
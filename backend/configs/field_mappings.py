@@ -125,6 +125,35 @@ FIELD_ALIASES = {
     "cashback": ["кешбек", "кэшбэк"],
 }
 
+# ============================================================================
+# EXTRACTION ALIASES: Ordered source names tried by DataNormalizer
+# ============================================================================
+
+EXTRACTION_ALIASES = {
+    "product_name": ["название", "карта", "product_name"],
+    "interest_rate": ["ставка", "процент", "процент_на_остаток", "interest_rate"],
+    "grace_period": ["грейс_период", "grace_period"],
+    "cashback": ["кешбек", "cashback"],
+    "annual_fee": ["стоимость", "стоимость_обслуживания", "annual_fee"],
+    "max_limit": ["лимит", "кредитный_лимит", "максимальный_лимит", "max_limit"],
+    "min_payment": ["минимальный_платеж", "min_payment"],
+    "withdrawals": ["снятие_наличных", "withdrawals"],
+    "transfers": ["переводы", "transfers"],
+    "min_salary_requirement": ["мин_зарплата"],
+    "commission": ["комиссия"],
+    "loyalty_program": ["программа_лояльности"],
+    "sms_notifications": ["смс"],
+    "monthly_limit": ["лимит_месячный"],
+    "term_months": ["срок"],
+    "min_amount": ["минимальная_сумма"],
+    "max_amount": ["максимальная_сумма"],
+    "replenishment": ["пополнение"],
+    "early_withdrawal": ["досрочное_снятие"],
+    "insurance": ["страхование"],
+    "approval_time": ["время_одобрения"],
+    "min_score": ["мин_скор"],
+}
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
@@ -144,6 +173,18 @@ def get_all_possible_field_names(normalized_field: str) -> List[str]:
                 all_names.add(source)
     return list(all_names)
 
+def get_extraction_sources(alias_group: str, normalized_field: str, product_type: str) -> List[str]:
+    """
+    Get ordered source field names for a normalized field:
+    extraction aliases first, then FIELD_ALIASES and the product mapping.
+    """
+    names = list(EXTRACTION_ALIASES.get(alias_group, []))
+    names.extend(FIELD_ALIASES.get(alias_group, []))
+    for source, target in get_mapping_for_product(product_type).items():
+        if target == normalized_field:
+            names.append(source)
+    return list(dict.fromkeys(names))
+
 def normalize_field_name(source_field: str, product_type: str) -> str:
     """Convert source field name to normalized field name"""
     mapping = get_mapping_for_product(product_type)
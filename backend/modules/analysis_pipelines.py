@@ -1,3 +1,6 @@
+from modules.async_data import run_blocking
+
+
 async def run_trends_pipeline(
     bank_names: List[str],
     product_type: str,
@@ -11,7 +14,8 @@ async def run_trends_pipeline(
     bank_name = bank_names[0] if bank_names else ""
     bank_internal = _normalize_bank_name(bank_name)
 
-    result = _trends_analyzer.analyze_trends(
+    result = await run_blocking(
+        _trends_analyzer.analyze_trends,
         bank=bank_internal,
         product_type=product_code,
         time_period=time_period,
@@ -43,8 +47,8 @@ async def run_trends_pipeline(
     # Generate timeline chart
     charts = {}
     try:
-        fig = _chart_generator.generate_timeline_chart(timeline)
-        charts["trends"] = _chart_generator.save_chart_html(fig)
+        fig = await run_blocking(_chart_generator.generate_timeline_chart, timeline)
+        charts["trends"] = await run_blocking(_chart_generator.save_chart_html, fig)
     except Exception:
         pass
 
@@ -0,0 +1,91 @@
+"""
+modules/async_data.py - Non-blocking data access for async pipelines
+
+Blocking work (file/SQLite reads, pandas, plotly, synchronous LLM clients)
+is moved off the event loop into one bounded thread pool shared by the
+whole process, so concurrent requests actually overlap.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+from modules.catalog import ProductCatalog, get_catalog
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Upper bound for blocking stages running at the same time
+MAX_WORKERS = int(os.getenv("BACKEND_MAX_WORKERS", str(min(32, (os.cpu_count() or 1) + 4))))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get the process-wide pool for blocking stages"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="blocking")
+    return _executor
+
+
+def shutdown_executor():
+    """Stop the pool, waiting for running stages to finish"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+async def run_blocking(func: Callable[..., T], *args, **kwargs) -> T:
+    """Run a blocking callable in the bounded pool and await its result"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), partial(func, *args, **kwargs))
+
+
+class AsyncBankDataReader:
+    """Awaitable wrapper around BankDataReader and the product catalog"""
+
+    def __init__(self, reader=None):
+        if reader is None:
+            from modules.scraper import BankDataReader
+            reader = BankDataReader()
+        self.reader = reader
+
+    async def get_product_data(self, bank: str, product_type: str) -> Dict[str, Any]:
+        """Load product data without blocking the event loop"""
+        return await run_blocking(self.reader.get_product_data, bank, product_type)
+
+    async def get_card(self, bank: str, product_type: str, card_name: str) -> Optional[Dict[str, Any]]:
+        """Read a single card without blocking the event loop"""
+        return await run_blocking(self.reader.get_card, bank, product_type, card_name)
+
+    async def get_many(self, banks: List[str], product_type: str) -> List[Dict[str, Any]]:
+        """Load product data for several banks concurrently"""
+        return list(await asyncio.gather(*(
+            self.get_product_data(bank, product_type) for bank in banks
+        )))
+
+    async def refresh_catalog(self) -> bool:
+        """Re-scan the data directory if the poll interval has passed"""
+        return await run_blocking(get_catalog().refresh_if_changed)
+
+    async def get_catalog(self) -> ProductCatalog:
+        """Get the catalog after picking up changed data files"""
+        await self.refresh_catalog()
+        return get_catalog()
+
+
+@lru_cache
+def get_async_reader() -> AsyncBankDataReader:
+    """Get the process-wide async data reader"""
+    return AsyncBankDataReader()
@@ -0,0 +1,139 @@
+"""
+modules/bank_aliases.py - Shared bank name resolution
+
+Maps every known spelling of a bank name ("Сбербанк", "Сбер", "СБЕРБАНК",
+"Т-Банк", "Тинькофф") to a canonical bank id. The index is built once
+from configs/bank_aliases.py, lookups are a dict hit with a cached
+fuzzy fallback for typos.
+"""
+
+import logging
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from configs.bank_aliases import BANK_ALIASES
+
+logger = logging.getLogger(__name__)
+
+_NON_ALNUM = re.compile(r"[\W_]+")
+_PARENTHESIZED = re.compile(r"\([^)]*\)")
+# Generic words carry no information about which bank is meant
+_GENERIC = re.compile(r"банк|bank")
+
+# Shortest distinctive key (without "банк") allowed to match with a typo
+FUZZY_MIN_LENGTH = 4
+
+
+def alias_key(name: str) -> str:
+    """Normalize bank name: case, "ё", punctuation and spaces are ignored"""
+    return _NON_ALNUM.sub("", str(name).casefold().replace("ё", "е"))
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """True if a and b differ by at most one insertion, deletion or substitution"""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:]
+    return a[i:] == b[i + 1:]
+
+
+class BankAliasIndex:
+    """O(1) bank name -> canonical id index"""
+
+    def __init__(self, bank_aliases: Dict[str, Dict] = BANK_ALIASES):
+        self._display_names: Dict[str, str] = {}
+        self._index: Dict[str, str] = {}
+        self._text_aliases: List[tuple] = []
+
+        for bank_id, info in bank_aliases.items():
+            display_name = info.get("display_name", bank_id)
+            self._display_names[bank_id] = display_name
+            for alias in [bank_id, display_name, *info.get("aliases", [])]:
+                key = alias_key(alias)
+                if key:
+                    self._index.setdefault(key, bank_id)
+                self._text_aliases.append((str(alias).casefold().replace("ё", "е"), bank_id))
+
+        # Longest aliases first so "альфа-банк" wins over "альфа" in free text
+        self._text_aliases.sort(key=lambda item: len(item[0]), reverse=True)
+
+        # Keys without "банк"/"bank": "отпбанк" must not look like "тбанк"
+        self._distinctive: Dict[str, set] = {}
+        for key, bank_id in self._index.items():
+            distinctive = _GENERIC.sub("", key)
+            if distinctive:
+                self._distinctive.setdefault(distinctive, set()).add(bank_id)
+
+    def resolve(self, name: Optional[str]) -> Optional[str]:
+        """Get canonical bank id for any spelling, None if unknown"""
+        if not name:
+            return None
+        key = alias_key(name)
+        bank_id = self._index.get(key)
+        if bank_id is None:
+            # Drop parenthesized parts like "Т-БАНК (Tinkoff)"
+            bank_id = self._index.get(alias_key(_PARENTHESIZED.sub("", str(name))))
+        if bank_id is None and key:
+            bank_id = self._fuzzy_resolve(key)
+        return bank_id
+
+    @lru_cache(maxsize=1024)
+    def _fuzzy_resolve(self, key: str) -> Optional[str]:
+        """
+        Match "Банк ВТБ" or a one-letter typo like "Сбербнк". Only unambiguous
+        matches are accepted: an unknown bank must stay unknown.
+        """
+        distinctive = _GENERIC.sub("", key)
+        candidates = self._distinctive.get(distinctive, set())
+        if not candidates and len(distinctive) >= FUZZY_MIN_LENGTH:
+            candidates = set()
+            for alias, bank_ids in self._distinctive.items():
+                if len(alias) >= FUZZY_MIN_LENGTH and _within_one_edit(distinctive, alias):
+                    candidates |= bank_ids
+            # Typo inside the generic part, e.g. "Сбербнк"
+            for alias, bank_id in self._index.items():
+                if _within_one_edit(key, alias):
+                    candidates.add(bank_id)
+        if len(candidates) == 1:
+            return next(iter(candidates))
+        logger.debug(f"Unknown bank name: {key}")
+        return None
+
+    def display_name(self, bank_id: str) -> str:
+        """Get human-readable bank name"""
+        return self._display_names.get(bank_id, bank_id)
+
+    def display_names(self) -> List[str]:
+        """Get display names of all known banks"""
+        return list(self._display_names.values())
+
+    def bank_ids(self) -> List[str]:
+        """Get all canonical bank ids"""
+        return list(self._display_names)
+
+    def find_in_text(self, text: str) -> List[str]:
+        """Find canonical ids of all banks mentioned in free text"""
+        text = str(text).casefold().replace("ё", "е")
+        found = []
+        for alias, bank_id in self._text_aliases:
+            if bank_id not in found and alias in text:
+                found.append(bank_id)
+        return found
+
+
+@lru_cache
+def get_bank_index() -> BankAliasIndex:
+    """Get the process-wide bank alias index"""
+    return BankAliasIndex()
+
+
+def resolve_bank(name: Optional[str]) -> Optional[str]:
+    """Shortcut for get_bank_index().resolve()"""
+    return get_bank_index().resolve(name)
@@ -0,0 +1,555 @@
+"""
+modules/catalog.py - Process-wide in-memory catalog of bank product files
+
+Loads every JSON file from configs/bank_data once and indexes the products
+by (bank, product_type) and the individual cards by (bank, product_type, card name),
+so request handlers never touch the disk or re-parse JSON.
+
+Multi-bank comparison files ("1_debit_comparison.json") are merged into the
+same index: their per-bank slices are addressable by (bank, product_type),
+and cards already present in a single-bank file are not duplicated but get
+the comparison file added to their sources.
+
+Changes are picked up by polling file mtimes: only files whose signature
+changed are re-parsed, and `version` changes only when the content does.
+
+For fast cold starts the directory can be compiled into a snapshot file
+(see build_snapshot). Files whose signature (mtime and size, or the manifest
+hash) matches the snapshot are taken from it without being read or hashed;
+only the rest are read from JSON. When the content is exactly the snapshot's,
+the persisted product and card indexes are reused instead of being rebuilt.
+
+Two directory layouts are supported:
+- flat: "<n>_<bank>_<product>.json" files directly in configs/bank_data;
+- sharded: "<product_type>/<bank>/*.json" (and "<product_type>/comparison/*.json")
+  listed in manifest.json with their hashes and product types (see build_manifest).
+  With a manifest only the shards of the requested product types are read,
+  and a manifest diff reloads only the shards whose hash changed.
+"""
+
+import gc
+import hashlib
+import json
+import logging
+import os
+import pickle
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Set, Tuple
+
+from modules.bank_aliases import alias_key, resolve_bank
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA_DIR = Path(__file__).parent.parent / "configs" / "bank_data"
+
+DEFAULT_SNAPSHOT_PATH = Path(os.getenv(
+    "BANK_DATA_SNAPSHOT",
+    str(Path(__file__).parent.parent / "configs" / "bank_data.snapshot"),
+))
+
+# Bump when the snapshot layout changes
+SNAPSHOT_FORMAT_VERSION = 2
+
+# Minimal number of seconds between two directory scans in refresh_if_changed()
+DEFAULT_POLL_INTERVAL = float(os.getenv("BANK_DATA_POLL_INTERVAL", "2.0"))
+
+# Single-bank files follow the "<n>_<bank>_<product>.json" convention
+PRODUCT_FILE_PATTERN = re.compile(r"^\d+_(?P<bank>[a-z]+)_(?P<product>credit|debit)\.json$")
+
+# Multi-bank files follow the "<n>_<product>_comparison.json" convention
+COMPARISON_FILE_PATTERN = re.compile(r"^\d+_(?P<product>credit|debit)_comparison\.json$")
+
+# File name suffix -> internal product type code
+FILE_PRODUCT_TYPES = {
+    "credit": "credit_card",
+    "debit": "debit_card",
+}
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_FORMAT_VERSION = 1
+
+# Directory name of multi-bank shards in the sharded layout
+COMPARISON_SHARD_DIR = "comparison"
+
+# File kinds
+KIND_PRODUCT = "product"
+KIND_COMPARISON = "comparison"
+
+# (kind, bank id or None for comparison files, product type)
+FileInfo = Tuple[str, Optional[str], str]
+
+
+def card_key(name: Any) -> str:
+    """Normalize card name for index lookups"""
+    return str(name or "").strip().casefold()
+
+
+def classify_file(relative_path: str) -> Optional[FileInfo]:
+    """Detect kind, bank and product type from a path relative to the data directory"""
+    parts = relative_path.split("/")
+
+    if len(parts) == 1:
+        match = PRODUCT_FILE_PATTERN.match(relative_path)
+        if match:
+            return KIND_PRODUCT, match.group("bank"), FILE_PRODUCT_TYPES[match.group("product")]
+        match = COMPARISON_FILE_PATTERN.match(relative_path)
+        if match:
+            return KIND_COMPARISON, None, FILE_PRODUCT_TYPES[match.group("product")]
+        return None
+
+    if len(parts) == 3:
+        product_type, bank, _ = parts
+        if bank == COMPARISON_SHARD_DIR:
+            return KIND_COMPARISON, None, product_type
+        return KIND_PRODUCT, bank, product_type
+
+    return None
+
+
+@dataclass
+class CatalogRecord:
+    """Single card with the list of files it was found in"""
+    bank: str
+    product_type: str
+    card: Dict[str, Any]
+    sources: List[str] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        return str(self.card.get("название", self.card.get("карта", "")))
+
+
+class ProductCatalog:
+    """In-memory index over all bank product files.
+
+    Returned documents and cards are shared between callers and must be
+    treated as read-only.
+    """
+
+    def __init__(
+        self,
+        data_dir: Optional[Path] = None,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        snapshot_path: Optional[Path] = None,
+        use_snapshot: bool = True,
+        product_types: Optional[Iterable[str]] = None
+    ):
+        self.data_dir = Path(data_dir) if data_dir else DEFAULT_DATA_DIR
+        self.poll_interval = poll_interval
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else DEFAULT_SNAPSHOT_PATH
+        self.use_snapshot = use_snapshot
+        # Load only shards of these product types (None means all)
+        self.product_types = frozenset(product_types) if product_types else None
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        self.version = ""
+        # Signature is (mtime_ns, size) in the flat layout and the manifest hash otherwise
+        self._signatures: Dict[str, Any] = {}
+        self._file_info: Dict[str, FileInfo] = {}
+        self._manifest_signature: Optional[Tuple[int, int]] = None
+        self._hashes: Dict[str, str] = {}
+        self._products: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._product_files: Dict[Tuple[str, str], str] = {}
+        self._comparison_slices: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._records: Dict[Tuple[str, str, str], CatalogRecord] = {}
+        self._banks: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+        self._snapshot: Dict[str, Tuple[Any, str, Dict[str, Any]]] = {}
+        self._snapshot_version = ""
+        self._snapshot_index: Dict[str, Any] = {}
+        self.load()
+
+    def load(self):
+        """Read and index every JSON file in the data directory"""
+        with self._lock:
+            self.documents = {}
+            self._signatures = {}
+            self._file_info = {}
+            self._manifest_signature = None
+            self._hashes = {}
+            if self.use_snapshot:
+                payload = load_snapshot(self.snapshot_path)
+                self._snapshot = payload.get("files", {})
+                self._snapshot_version = payload.get("version", "")
+                self._snapshot_index = payload.get("index", {})
+            try:
+                self._refresh_locked()
+            finally:
+                # Snapshot is only needed for the initial load
+                self._snapshot = {}
+                self._snapshot_index = {}
+        logger.info(f"Product catalog loaded: {len(self.documents)} files, {len(self._records)} cards")
+
+    def refresh(self) -> bool:
+        """
+        Re-read only the files whose mtime or size (or manifest hash) changed
+        since the last scan.
+
+        Returns:
+            True if the catalog contents changed
+        """
+        with self._lock:
+            return self._refresh_locked()
+
+    def refresh_if_changed(self) -> bool:
+        """Poll the data directory at most once per poll_interval seconds"""
+        now = time.monotonic()
+        if now - self._last_check < self.poll_interval:
+            return False
+        return self.refresh()
+
+    def _refresh_locked(self) -> bool:
+        self._last_check = time.monotonic()
+        signatures, file_info = self._scan()
+
+        documents = dict(self.documents)
+        hashes = dict(self._hashes)
+        changed = False
+
+        for file_name in set(documents) - set(signatures):
+            documents.pop(file_name, None)
+            hashes.pop(file_name, None)
+            changed = True
+
+        for file_name, signature in signatures.items():
+            if self._signatures.get(file_name) == signature:
+                continue
+            snapshot_entry = self._snapshot.get(file_name)
+            if snapshot_entry and snapshot_entry[0] == signature:
+                # Unchanged since the snapshot was built: no read, no hash
+                _, content_hash, data = snapshot_entry
+                if hashes.get(file_name) != content_hash:
+                    changed = True
+                documents[file_name] = data
+                hashes[file_name] = content_hash
+                continue
+            file_path = self.data_dir / file_name
+            try:
+                raw = file_path.read_bytes()
+                content_hash = hashlib.sha256(raw).hexdigest()
+                if self._manifest_signature and signature != content_hash:
+                    logger.warning(f"Hash of {file_path} does not match the manifest")
+                if snapshot_entry and snapshot_entry[1] == content_hash:
+                    # Touched but not modified
+                    data = snapshot_entry[2]
+                else:
+                    data = json.loads(raw.decode('utf-8'))
+            except Exception as e:
+                logger.error(f"Error reading data file {file_path}: {e}")
+                if documents.pop(file_name, None) is not None:
+                    hashes.pop(file_name, None)
+                    changed = True
+                continue
+            if hashes.get(file_name) != content_hash:
+                changed = True
+            documents[file_name] = data
+            hashes[file_name] = content_hash
+
+        self._signatures = signatures
+        self._file_info = file_info
+        if changed or not self.version:
+            self.documents = dict(sorted(documents.items()))
+            self._hashes = hashes
+            self.version = self._compute_version()
+            if (self._snapshot_index and self.product_types is None
+                    and self.version == self._snapshot_version):
+                self._apply_index(self._snapshot_index)
+                logger.info(f"Product catalog index taken from snapshot, version {self.version}")
+            else:
+                self._reindex()
+                logger.info(f"Product catalog indexed, version {self.version}")
+        return changed
+
+    def _export_index(self) -> Dict[str, Any]:
+        return {
+            "products": self._products,
+            "product_files": self._product_files,
+            "comparison_slices": self._comparison_slices,
+            "records": self._records,
+            "banks": self._banks,
+        }
+
+    def _apply_index(self, index: Dict[str, Any]):
+        self._products = index["products"]
+        self._product_files = index["product_files"]
+        self._comparison_slices = index["comparison_slices"]
+        self._records = index["records"]
+        self._banks = index["banks"]
+
+    def _scan(self) -> Tuple[Dict[str, Any], Dict[str, FileInfo]]:
+        """Collect file signatures and kinds without reading file contents"""
+        manifest_path = self.data_dir / MANIFEST_NAME
+        try:
+            stat = manifest_path.stat()
+        except FileNotFoundError:
+            self._manifest_signature = None
+            return self._scan_flat()
+
+        manifest_signature = (stat.st_mtime_ns, stat.st_size)
+        if manifest_signature == self._manifest_signature:
+            # Manifest unchanged: nothing to reload
+            return self._signatures, self._file_info
+
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except Exception as e:
+            logger.error(f"Error reading manifest {manifest_path}: {e}")
+            return self._signatures, self._file_info
+
+        signatures = {}
+        file_info = {}
+        for shard in manifest.get("shards", []):
+            path = shard.get("path")
+            product_type = shard.get("product_type")
+            if not path or not product_type:
+                continue
+            if self.product_types is not None and product_type not in self.product_types:
+                continue
+            signatures[path] = shard.get("sha256")
+            file_info[path] = (shard.get("kind", KIND_PRODUCT), shard.get("bank"), product_type)
+
+        self._manifest_signature = manifest_signature
+        return signatures, file_info
+
+    def _scan_flat(self) -> Tuple[Dict[str, Any], Dict[str, FileInfo]]:
+        """Collect (mtime_ns, size) for every JSON file of the flat layout"""
+        signatures = {}
+        file_info = {}
+        try:
+            with os.scandir(self.data_dir) as entries:
+                for entry in entries:
+                    if not entry.is_file() or not entry.name.endswith(".json"):
+                        continue
+                    info = classify_file(entry.name)
+                    if info is None:
+                        continue
+                    if self.product_types is not None and info[2] not in self.product_types:
+                        continue
+                    stat = entry.stat()
+                    signatures[entry.name] = (stat.st_mtime_ns, stat.st_size)
+                    file_info[entry.name] = info
+        except FileNotFoundError:
+            logger.error(f"Bank data directory not found: {self.data_dir}")
+        return signatures, file_info
+
+    def _compute_version(self) -> str:
+        digest = hashlib.sha256()
+        for file_name in sorted(self._hashes):
+            digest.update(file_name.encode('utf-8'))
+            digest.update(self._hashes[file_name].encode('ascii'))
+        return digest.hexdigest()[:16]
+
+    def _reindex(self):
+        """Rebuild product and card indexes from loaded documents"""
+        products = {}
+        product_files = {}
+        comparison_slices = {}
+        records = {}
+        banks = {}
+        comparison_files = []
+
+        # Single-bank files are the primary source of card data
+        for file_name, data in self.documents.items():
+            info = self._file_info.get(file_name)
+            if info is None or not isinstance(data, dict):
+                continue
+            kind, bank, product_type = info
+            if kind == KIND_COMPARISON:
+                comparison_files.append((file_name, product_type, data))
+                continue
+            products[(bank, product_type)] = data
+            product_files[(bank, product_type)] = file_name
+            banks.setdefault(product_type, set()).add(bank)
+            for card in data.get("карты", []):
+                if isinstance(card, dict):
+                    record = CatalogRecord(bank, product_type, card, [file_name])
+                    records[(bank, product_type, card_key(record.name))] = record
+
+        # Comparison files only add cards that are missing from single-bank files
+        for file_name, product_type, data in comparison_files:
+            for bank_name, bank_slice in data.get("банки", {}).items():
+                if not isinstance(bank_slice, dict):
+                    continue
+                bank = resolve_bank(bank_name) or alias_key(bank_name)
+                comparison_slices[(bank, product_type)] = bank_slice
+                banks.setdefault(product_type, set()).add(bank)
+
+                record = CatalogRecord(bank, product_type, bank_slice, [file_name])
+                key = (bank, product_type, card_key(record.name))
+                if key in records:
+                    records[key].sources.append(file_name)
+                else:
+                    records[key] = record
+
+        self._products = products
+        self._product_files = product_files
+        self._comparison_slices = comparison_slices
+        self._records = records
+        self._banks = banks
+
+    def get_document(self, file_name: str) -> Optional[Dict[str, Any]]:
+        """Get parsed file contents by file name"""
+        return self.documents.get(file_name)
+
+    def get_file_hash(self, file_name: str) -> Optional[str]:
+        """Get SHA-256 of the file contents"""
+        return self._hashes.get(file_name)
+
+    def get_file_info(self, file_name: str) -> Optional[FileInfo]:
+        """Get (kind, bank, product type) of a file"""
+        return self._file_info.get(file_name)
+
+    def get_product(self, bank: str, product_type: str) -> Optional[Dict[str, Any]]:
+        """Get product file data by bank key (e.g. "vtb") and product type"""
+        return self._products.get((bank, product_type))
+
+    def get_product_path(self, bank: str, product_type: str) -> Optional[Path]:
+        """Get path of the product file for streaming reads"""
+        file_name = self._product_files.get((bank, product_type))
+        return self.data_dir / file_name if file_name else None
+
+    def get_comparison_slice(self, bank: str, product_type: str) -> Optional[Dict[str, Any]]:
+        """Get the bank's entry from the multi-bank comparison file"""
+        return self._comparison_slices.get((bank, product_type))
+
+    def get_card(self, bank: str, product_type: str, card_name: str) -> Optional[Dict[str, Any]]:
+        """Get a single card by bank key, product type and card name"""
+        record = self._records.get((bank, product_type, card_key(card_name)))
+        return record.card if record else None
+
+    def get_record(self, bank: str, product_type: str, card_name: str) -> Optional[CatalogRecord]:
+        """Get a card together with its provenance"""
+        return self._records.get((bank, product_type, card_key(card_name)))
+
+    def iter_records(self, product_type: Optional[str] = None) -> Iterator[CatalogRecord]:
+        """Iterate over deduplicated cards, optionally of one product type"""
+        for record in list(self._records.values()):
+            if product_type is None or record.product_type == product_type:
+                yield record
+
+    def get_banks(self, product_type: Optional[str] = None) -> List[str]:
+        """Get ids of banks that have data for the product type (or any)"""
+        if product_type is not None:
+            return sorted(self._banks.get(product_type, ()))
+        return sorted(set().union(*self._banks.values()))
+
+    def iter_documents(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Iterate over (file name, data) pairs"""
+        return iter(self.documents.items())
+
+    def iter_products(self) -> Iterator[Tuple[str, str, str, Dict[str, Any]]]:
+        """Iterate over single-bank files as (file name, bank, product type, data)"""
+        for file_name, data in list(self.documents.items()):
+            kind, bank, product_type = self._file_info.get(file_name, (None, None, None))
+            if kind == KIND_PRODUCT:
+                yield file_name, bank, product_type, data
+
+
+def build_snapshot(
+    data_dir: Optional[Path] = None,
+    snapshot_path: Optional[Path] = None
+) -> Path:
+    """
+    Compile all JSON files of the data directory into one snapshot file.
+
+    Returns:
+        Path of the written snapshot
+    """
+    catalog = ProductCatalog(data_dir, use_snapshot=False)
+    snapshot_path = Path(snapshot_path) if snapshot_path else DEFAULT_SNAPSHOT_PATH
+
+    # Pickled together, so index entries share the document objects
+    payload = {
+        "format": SNAPSHOT_FORMAT_VERSION,
+        "version": catalog.version,
+        "files": {
+            file_name: (catalog._signatures[file_name], catalog._hashes[file_name], data)
+            for file_name, data in catalog.documents.items()
+        },
+        "index": catalog._export_index(),
+    }
+
+    tmp_path = snapshot_path.with_name(snapshot_path.name + ".tmp")
+    tmp_path.write_bytes(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+    os.replace(tmp_path, snapshot_path)
+    logger.info(f"Snapshot saved: {snapshot_path} ({len(payload['files'])} files, version {catalog.version})")
+    return snapshot_path
+
+
+def build_manifest(data_dir: Optional[Path] = None) -> Path:
+    """
+    Write manifest.json listing every shard of the data directory
+    with its content hash, kind, bank and product type.
+
+    Returns:
+        Path of the written manifest
+    """
+    data_dir = Path(data_dir) if data_dir else DEFAULT_DATA_DIR
+    shards = []
+    for file_path in sorted(data_dir.rglob("*.json")):
+        relative_path = file_path.relative_to(data_dir).as_posix()
+        if relative_path == MANIFEST_NAME:
+            continue
+        info = classify_file(relative_path)
+        if info is None:
+            logger.warning(f"Skipping file with unknown layout: {relative_path}")
+            continue
+        kind, bank, product_type = info
+        shard = {
+            "path": relative_path,
+            "sha256": hashlib.sha256(file_path.read_bytes()).hexdigest(),
+            "kind": kind,
+            "product_type": product_type,
+        }
+        if bank:
+            shard["bank"] = bank
+        shards.append(shard)
+
+    manifest_path = data_dir / MANIFEST_NAME
+    tmp_path = manifest_path.with_name(MANIFEST_NAME + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"format": MANIFEST_FORMAT_VERSION, "shards": shards}, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, manifest_path)
+    logger.info(f"Manifest saved: {manifest_path} ({len(shards)} shards)")
+    return manifest_path
+
+
+def load_snapshot(snapshot_path: Path) -> Dict[str, Any]:
+    """
+    Load a snapshot payload: version, files (file name -> (signature,
+    content hash, data)) and the product/card index built from them.
+    Returns empty dict when the snapshot is missing or has another format.
+    """
+    gc_enabled = gc.isenabled()
+    try:
+        raw = Path(snapshot_path).read_bytes()
+        # Unpickling creates many objects and no cycles: skip GC passes meanwhile
+        gc.disable()
+        payload = pickle.loads(raw)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"Could not read snapshot {snapshot_path}: {e}")
+        return {}
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    if not isinstance(payload, dict) or payload.get("format") != SNAPSHOT_FORMAT_VERSION:
+        logger.warning(f"Ignoring snapshot {snapshot_path}: unsupported format")
+        return {}
+
+    logger.info(f"Snapshot loaded: {snapshot_path} (version {payload.get('version')})")
+    return payload
+
+
+@lru_cache
+def get_catalog() -> ProductCatalog:
+    """Get the process-wide product catalog"""
+    return ProductCatalog()
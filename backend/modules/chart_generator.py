@@ -10,6 +10,8 @@ from datetime import datetime
 import io
 import base64
 
+from modules.value_parser import parse_value
+
 logger = logging.getLogger(__name__)
 
 
@@ -110,28 +112,24 @@ class ChartGenerator:
         if comparison_table is None or comparison_table.empty:
             return self._create_empty_chart("Нет данных для сравнения")
         
-        # Extract comparison metrics (assuming first column is parameter names)
-        parameters = comparison_table.iloc[:, 0].tolist()
-        
-        # Get bank names from column headers (skip first column)
-        banks = comparison_table.columns[1:].tolist()
+        # Get bank names from column headers (first column is parameter names)
+        banks = comparison_table.banks
         
         # Create grouped bar chart for numeric parameters only
         numeric_params = []
         bank_values = {bank: [] for bank in banks}
         
-        for idx, param in enumerate(parameters):
+        for param, row in comparison_table.iter_bank_values():
             # Try to extract numeric values
             try:
                 values = []
                 is_numeric = True
-                for bank in banks:
-                    value_str = str(comparison_table.iloc[idx, comparison_table.columns.get_loc(bank)])
+                for value in row:
+                    value_str = str(value)
                     # Extract number from string (e.g., "18.5%" -> 18.5)
-                    import re
-                    num_match = re.search(r'(\d+\.?\d*)', value_str)
-                    if num_match:
-                        values.append(float(num_match.group(1)))
+                    number = parse_value(value_str).min
+                    if number is not None:
+                        values.append(number)
                     else:
                         is_numeric = False
                         break
@@ -8,9 +8,10 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import plotly.express as px
 from datetime import datetime
-import pandas as pd
 import numpy as np
 
+from modules.value_parser import parse_value
+
 logger = logging.getLogger(__name__)
 
 
@@ -85,19 +86,18 @@ class EnhancedChartGenerator:
         parameters = []
         bank_values = {}
         
-        banks = comparison_table.columns[1:].tolist()
+        banks = comparison_table.banks
         
-        for idx, param in enumerate(comparison_table.iloc[:, 0].tolist()):
+        for param, row in comparison_table.iter_bank_values():
             try:
-                import re
                 values = []
                 is_numeric = True
                 
-                for bank in banks:
-                    value_str = str(comparison_table.iloc[idx, comparison_table.columns.get_loc(bank)])
-                    num_match = re.search(r'(\d+\.?\d*)', value_str)
-                    if num_match:
-                        values.append(float(num_match.group(1)))
+                for value in row:
+                    value_str = str(value)
+                    number = parse_value(value_str).min
+                    if number is not None:
+                        values.append(number)
                     else:
                         is_numeric = False
                         break
@@ -184,20 +184,19 @@ class EnhancedChartGenerator:
         
         # Extract numeric data
         parameters = []
-        banks = comparison_table.columns[1:].tolist()
+        banks = comparison_table.banks
         values_matrix = []
         
-        for idx, param in enumerate(comparison_table.iloc[:, 0].tolist()):
+        for param, row in comparison_table.iter_bank_values():
             try:
-                import re
                 row_values = []
                 is_numeric = True
                 
-                for bank in banks:
-                    value_str = str(comparison_table.iloc[idx, comparison_table.columns.get_loc(bank)])
-                    num_match = re.search(r'(\d+\.?\d*)', value_str)
-                    if num_match:
-                        row_values.append(float(num_match.group(1)))
+                for value in row:
+                    value_str = str(value)
+                    number = parse_value(value_str).min
+                    if number is not None:
+                        row_values.append(number)
                     else:
                         is_numeric = False
                         break
@@ -337,20 +336,13 @@ class EnhancedChartGenerator:
         rates = [item.get('rate', 0) for item in timeline]
         reasons = [item.get('reason', 'Н/Д') for item in timeline]
         
-        # Create dataframe for animation
-        df = pd.DataFrame({
-            'date': dates,
-            'rate': rates,
-            'reason': reasons
-        })
-        
         # Create figure with gradient fill
         fig = go.Figure()
         
         # Add area chart with gradient
         fig.add_trace(go.Scatter(
-            x=df['date'],
-            y=df['rate'],
+            x=dates,
+            y=rates,
             mode='lines',
             name='Ставка',
             line=dict(
@@ -364,8 +356,8 @@ class EnhancedChartGenerator:
         
         # Add main line
         fig.add_trace(go.Scatter(
-            x=df['date'],
-            y=df['rate'],
+            x=dates,
+            y=rates,
             mode='lines+markers',
             name='Ставка',
             line=dict(
@@ -380,16 +372,16 @@ class EnhancedChartGenerator:
                 symbol='circle'
             ),
             hovertemplate='<b>Дата:</b> %{x|%d.%m.%Y}<br><b>Ставка:</b> %{y:.2f}%<br><b>Причина:</b> %{text}<extra></extra>',
-            text=df['reason']
+            text=reasons
         ))
         
         # Add annotations for key points
-        if len(df) > 0:
+        if dates:
             # Annotate first point
             fig.add_annotation(
-                x=df['date'].iloc[0],
-                y=df['rate'].iloc[0],
-                text=f"Начало: {df['rate'].iloc[0]:.1f}%",
+                x=dates[0],
+                y=rates[0],
+                text=f"Начало: {rates[0]:.1f}%",
                 showarrow=True,
                 arrowhead=2,
                 ax=0,
@@ -402,9 +394,9 @@ class EnhancedChartGenerator:
             
             # Annotate last point
             fig.add_annotation(
-                x=df['date'].iloc[-1],
-                y=df['rate'].iloc[-1],
-                text=f"Сейчас: {df['rate'].iloc[-1]:.1f}%",
+                x=dates[-1],
+                y=rates[-1],
+                text=f"Сейчас: {rates[-1]:.1f}%",
                 showarrow=True,
                 arrowhead=2,
                 ax=0,
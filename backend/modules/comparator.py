@@ -4,7 +4,8 @@ modules/comparator.py - Comparison and insights generation
 
 import logging
 from typing import Dict, Any, List, Optional
-import pandas as pd
+from modules.comparison_table import ComparisonTable
+from modules.value_parser import parse_value
 
 logger = logging.getLogger(__name__)
 
@@ -16,8 +17,8 @@ class ProductComparator:
                         product_type: str) -> Dict[str, Any]:
         """Generate comparison report"""
         
-        # Create comparison dataframe
-        comparison_df = pd.DataFrame({
+        # Create comparison table
+        comparison_table = ComparisonTable.from_columns({
             "Параметр": list(sber_data.keys()),
             "Сбер": list(sber_data.values()),
             "Конкурент": [competitor_data.get(k, "Н/Д") for k in sber_data.keys()]
@@ -31,7 +32,7 @@ class ProductComparator:
         competitor_advantages = self._find_advantages(competitor_data, sber_data, product_type)
         
         return {
-            "comparison_table": comparison_df,
+            "comparison_table": comparison_table,
             "insights": insights,
             "sber_advantages": sber_advantages,
             "competitor_advantages": competitor_advantages,
@@ -71,17 +72,8 @@ class ProductComparator:
     
     def _extract_rate(self, rate_str: str) -> Optional[float]:
         """Extract numeric rate from string, handles ranges."""
-        if not rate_str or rate_str == "Н/Д":
-            return None
-        try:
-            # If it's a range like "17.9% - 25.9%", take the first number
-            if '-' in str(rate_str):
-                rate_str = str(rate_str).split('-')[0]
-            
-            return float(str(rate_str).replace('%', '').replace('₽', '').strip())
-        except (ValueError, TypeError):
-            logger.warning(f"Could not extract rate from '{rate_str}'")
-            return None
+        # For a range like "17.9% - 25.9%" the lower bound is used
+        return parse_value(rate_str).min
 
     def _find_advantages(self, first: Dict, second: Dict, product_type: str) -> List[str]:
         """Find competitive advantages of first vs second"""
@@ -97,15 +89,10 @@ class ProductComparator:
                 advantages.append(f"• Более высокая процентная ставка: {first.get('interest_rate')}")
 
         # Annual fee comparison (lower is better)
-        fee1_str = str(first.get("annual_fee", "Н/Д")).replace('₽', '')
-        fee2_str = str(second.get("annual_fee", "Н/Д")).replace('₽', '')
-        try:
-            fee1 = float(fee1_str)
-            fee2 = float(fee2_str)
-            if fee1 < fee2:
-                advantages.append(f"• Более низкая стоимость обслуживания: {first.get('annual_fee')}")
-        except (ValueError, TypeError):
-            pass # Cannot compare fees if they are not numeric
+        fee1 = parse_value(first.get("annual_fee")).min
+        fee2 = parse_value(second.get("annual_fee")).min
+        if fee1 is not None and fee2 is not None and fee1 < fee2:
+            advantages.append(f"• Более низкая стоимость обслуживания: {first.get('annual_fee')}")
 
         return advantages if advantages else ["Преимущества не найдены"]
 
@@ -0,0 +1,92 @@
+"""
+modules/comparison_table.py - Lightweight comparison table
+
+Comparators return a ComparisonTable instead of a pandas DataFrame: the
+first column holds parameter names, the other columns hold bank values.
+pandas is imported only when an export asks for a DataFrame.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+
+class ComparisonTable:
+    """Row-oriented table with named columns"""
+
+    __slots__ = ("columns", "rows")
+
+    def __init__(self, columns: Sequence[str], rows: Optional[List[List[Any]]] = None):
+        self.columns: List[str] = list(columns)
+        self.rows: List[List[Any]] = rows if rows is not None else []
+
+    @classmethod
+    def from_columns(cls, data: Dict[str, Sequence[Any]]) -> "ComparisonTable":
+        """Build from {column: values}, like pd.DataFrame(dict)"""
+        columns = list(data)
+        return cls(columns, [list(row) for row in zip(*(data[name] for name in columns))])
+
+    @property
+    def empty(self) -> bool:
+        return not self.rows or not self.columns
+
+    @property
+    def values(self) -> List[List[Any]]:
+        return self.rows
+
+    @property
+    def parameters(self) -> List[Any]:
+        """First column: parameter names"""
+        return [row[0] for row in self.rows]
+
+    @property
+    def banks(self) -> List[str]:
+        """Value columns: bank names"""
+        return self.columns[1:]
+
+    def column(self, name: str) -> List[Any]:
+        idx = self.columns.index(name)
+        return [row[idx] for row in self.rows]
+
+    def iter_bank_values(self) -> Iterator[tuple]:
+        """Yield (parameter, [values in bank column order]) per row"""
+        for row in self.rows:
+            yield row[0], row[1:]
+
+    def to_comparison_items(self) -> List[Dict[str, str]]:
+        """
+        Flatten to ComparisonItem dicts. With several competitors
+        the competitor value lists every bank as "Банк: значение".
+        """
+        items = []
+        for parameter, values in self.iter_bank_values():
+            reference = values[0] if values else "Н/Д"
+            competitors = values[1:]
+            if len(competitors) == 1:
+                competitor_value = str(competitors[0])
+            else:
+                competitor_value = "; ".join(
+                    f"{bank}: {value}" for bank, value in zip(self.columns[2:], competitors)
+                )
+            items.append({
+                "parameter": str(parameter),
+                "sber_value": str(reference),
+                "competitor_value": competitor_value,
+            })
+        return items
+
+    def to_dataframe(self):
+        """Convert to pandas DataFrame (for XLSX/PDF exports)"""
+        import pandas as pd
+        return pd.DataFrame(self.rows, columns=self.columns)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __repr__(self) -> str:
+        return f"ComparisonTable(columns={self.columns!r}, rows={len(self.rows)})"
+
+
+def as_dataframe(table: Any):
+    """DataFrame view of a comparison table (ComparisonTable or DataFrame), None stays None"""
+    if isinstance(table, ComparisonTable):
+        return table.to_dataframe()
+    return table
@@ -0,0 +1,95 @@
+"""
+modules/export_pipeline.py - Lazy read → validate → normalize pipeline
+
+Each stage is a generator, so the whole market can be streamed record by
+record (e.g. as NDJSON) without building the full list in memory.
+"""
+
+import json
+import logging
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+
+from modules.catalog import CatalogRecord, ProductCatalog, card_key, get_catalog
+from modules.normalization_cache import NormalizationCache, get_normalization_cache
+from modules.validator import DataValidator
+
+logger = logging.getLogger(__name__)
+
+ValidatedRecord = Tuple[CatalogRecord, bool, List[str]]
+
+
+def read_records(
+    catalog: Optional[ProductCatalog] = None,
+    product_type: Optional[str] = None
+) -> Iterator[CatalogRecord]:
+    """Stage 1: deduplicated catalog cards"""
+    catalog = catalog or get_catalog()
+    yield from catalog.iter_records(product_type)
+
+
+def validate_records(
+    records: Iterable[CatalogRecord],
+    catalog: Optional[ProductCatalog] = None,
+    validator: Optional[DataValidator] = None
+) -> Iterator[ValidatedRecord]:
+    """Stage 2: validate every card together with the date of its source file"""
+    catalog = catalog or get_catalog()
+    validator = validator or DataValidator()
+    for record in records:
+        source = catalog.get_document(record.sources[0]) or {}
+        card_data = {"дата": source.get("дата"), **record.card}
+        is_valid, issues = validator.validate_product_data(card_data, record.product_type, record.bank)
+        yield record, is_valid, issues
+
+
+def normalize_records(
+    validated: Iterable[ValidatedRecord],
+    cache: Optional[NormalizationCache] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stage 3: normalized rows with typed numeric fields and validation verdict.
+    Cards are read from the normalization cache; only misses are normalized.
+    """
+    cache = cache or get_normalization_cache()
+    for record, is_valid, issues in validated:
+        entries = cache.get_file_entries(record.sources[0], record.product_type)
+        entry = entries.get(f"{record.bank}|{card_key(record.name)}")
+        if entry is not None:
+            display, numeric = entry["normalized"], entry["numeric"]
+        else:
+            try:
+                normalized = cache.normalizer.normalize_record(record.card, record.bank, record.product_type)
+            except Exception as e:
+                logger.warning(f"Skipping {record.bank}/{record.name}: {e}")
+                continue
+            display, numeric = normalized.to_dict(), normalized.numeric()
+        yield {
+            "product_type": record.product_type,
+            **display,
+            "numeric": numeric,
+            "sources": list(record.sources),
+            "is_valid": is_valid,
+            "issues": issues,
+        }
+
+
+def iter_normalized_products(
+    product_type: Optional[str] = None,
+    valid_only: bool = False,
+    catalog: Optional[ProductCatalog] = None
+) -> Iterator[Dict[str, Any]]:
+    """Chain all stages: catalog read → DataValidator → normalization cache"""
+    cache = get_normalization_cache()
+    if catalog is not None and catalog is not cache.catalog:
+        cache = NormalizationCache(catalog=catalog)
+    catalog = cache.catalog
+    validated = validate_records(read_records(catalog, product_type), catalog)
+    if valid_only:
+        validated = (item for item in validated if item[1])
+    return normalize_records(validated, cache)
+
+
+def iter_ndjson(rows: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """Encode rows as newline-delimited JSON"""
+    for row in rows:
+        yield (json.dumps(row, ensure_ascii=False) + "\n").encode("utf-8")
@@ -3,12 +3,16 @@ modules/historical_generator.py - Generate historical data for trends analysis
 """
 
 import logging
-import json
 from typing import Dict, Any, List
 from datetime import datetime, timedelta
 from pathlib import Path
 import random
 
+from modules.bank_aliases import resolve_bank
+from modules.catalog import get_catalog
+from modules.product_store import get_product_store
+from modules.value_parser import parse_value
+
 logger = logging.getLogger(__name__)
 
 
@@ -17,7 +21,9 @@ class HistoricalDataGenerator:
     
     def __init__(self):
         self.project_root = Path(__file__).parent.parent.absolute()
-        self.data_dir = self.project_root / "configs" / "bank_data"
+        self.catalog = get_catalog()
+        self.data_dir = self.catalog.data_dir
+        self.store = get_product_store()
     
     def generate_historical_timeline(
         self,
@@ -65,44 +71,26 @@ class HistoricalDataGenerator:
         return timeline
     
     def _load_current_data(self, bank: str, product_type: str) -> Dict[str, Any]:
-        """Лоад current product data from JSON files"""
-        
-        # Map bank names to file prefixes
-        bank_mapping = {
-            "ВТБ": "vtb",
-            "Альфа": "alfabank",
-            "Тинькофф": "tbank",
-            "Газпромбанк": "gazprom",
-            "Локобанк": "loko",
-            "МТС Банк": "mts",
-            "Райффайзенбанк": "raif",
-            "Сбер": "sberbank"
-        }
+        """Лоад current product data from the product store"""
         
-        # Map product types to file suffixes
+        # Map product types to stored product types
         product_mapping = {
-            "credit_card": "credit",
-            "debit_card": "debit",
-            "deposit": "debit",  # Using debit as proxy for deposit
-            "consumer_loan": "credit"  # Using credit as proxy for consumer loan
+            "credit_card": "credit_card",
+            "debit_card": "debit_card",
+            "deposit": "debit_card",  # Using debit as proxy for deposit
+            "consumer_loan": "credit_card"  # Using credit as proxy for consumer loan
         }
         
-        bank_prefix = bank_mapping.get(bank)
-        product_suffix = product_mapping.get(product_type)
+        bank_id = resolve_bank(bank)
+        catalog_product = product_mapping.get(product_type)
         
-        if not bank_prefix or not product_suffix:
+        if not bank_id or not catalog_product:
             logger.error(f"Unknown bank or product type: {bank}, {product_type}")
             return {}
         
-        # Find matching files
-        for file_path in self.data_dir.glob(f"*{bank_prefix}*{product_suffix}.json"):
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    logger.info(f"Loaded data from {file_path.name}")
-                    return data
-            except Exception as e:
-                logger.error(f"Error loading {file_path}: {e}")
+        data = self.store.get_product(bank_id, catalog_product)
+        if data:
+            return data
         
         logger.warning(f"No data file found for {bank} {product_type}")
         return {}
@@ -177,37 +165,19 @@ class HistoricalDataGenerator:
             
             card = cards[0]
             
-            # For credit cards - look for interest rate
-            if product_type == "credit_card":
-                # Try various keys
-                for key in ['процентная_ставка', 'ставка', 'rate']:
-                    if key in card:
-                        rate_str = str(card[key])
-                        # Extract number from string
-                        import re
-                        match = re.search(r'(\d+\.?\d*)', rate_str)
-                        if match:
-                            return float(match.group(1))
-            
-            # For deposits - look for deposit rate
-            elif product_type == "deposit":
-                for key in ['процент_на_остаток', 'ставка', 'rate']:
-                    if key in card:
-                        rate_str = str(card[key])
-                        import re
-                        match = re.search(r'(\d+\.?\d*)', rate_str)
-                        if match:
-                            return float(match.group(1))
+            # Try various keys
+            if product_type == "deposit":
+                keys = ['процент_на_остаток', 'ставка', 'rate']
+            elif product_type in ("credit_card", "consumer_loan"):
+                keys = ['процентная_ставка', 'ставка', 'rate']
+            else:
+                keys = []
             
-            # For consumer loan
-            elif product_type == "consumer_loan":
-                for key in ['процентная_ставка', 'ставка', 'rate']:
-                    if key in card:
-                        rate_str = str(card[key])
-                        import re
-                        match = re.search(r'(\d+\.?\d*)', rate_str)
-                        if match:
-                            return float(match.group(1))
+            for key in keys:
+                if key in card:
+                    rate = parse_value(card[key]).min
+                    if rate is not None:
+                        return rate
             
             logger.warning(f"Could not find rate in data: {card.keys()}")
             return None
@@ -0,0 +1,111 @@
+"""
+modules/json_stream.py - Incremental JSON reading for large product files
+
+Streams the items of one top-level array (e.g. "карты") from a JSON object
+without loading the whole document into memory.
+"""
+
+import json
+import re
+from typing import Any, Iterator, TextIO
+
+_WHITESPACE = re.compile(r"\s*")
+_NUMBER_CHARS = frozenset("0123456789.eE+-")
+_decoder = json.JSONDecoder()
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class _ChunkReader:
+    """Buffered cursor over a text stream that decodes one JSON value at a time"""
+
+    def __init__(self, stream: TextIO, chunk_size: int):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size: int):
+        chunk = self.stream.read(size)
+        if not chunk:
+            self.eof = True
+            return
+        # Drop already consumed text to keep memory bounded
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+
+    def peek(self) -> str:
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or self.eof:
+                return self.buffer[self.pos:self.pos + 1]
+            self._fill(self.chunk_size)
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' at offset {self.pos}, found '{found}'")
+        self.pos += 1
+
+    def next_char(self) -> str:
+        char = self.peek()
+        self.pos += 1
+        return char
+
+    def decode(self) -> Any:
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            else:
+                # A number cut by the chunk boundary ("8." of "8.5") must be re-read
+                truncated = end == len(self.buffer) or (
+                    isinstance(value, (int, float)) and self.buffer[end] in _NUMBER_CHARS
+                )
+                if not truncated or self.eof:
+                    self.pos = end
+                    return value
+            # Grow reads geometrically so large values are not re-parsed too often
+            self._fill(size)
+            size *= 2
+
+
+def iter_array_items(stream: TextIO, key: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Yield items of the top-level array stored under `key` one at a time.
+
+    Other top-level values are decoded and discarded. Nothing is yielded
+    if the key is missing.
+    """
+    reader = _ChunkReader(stream, chunk_size)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+
+    while True:
+        field = reader.decode()
+        reader.expect(":")
+
+        if field == key:
+            reader.expect("[")
+            if reader.peek() == "]":
+                return
+            while True:
+                yield reader.decode()
+                separator = reader.next_char()
+                if separator == "]":
+                    return
+                if separator != ",":
+                    raise ValueError(f"Expected ',' or ']' in '{key}' array, found '{separator}'")
+
+        reader.decode()
+        separator = reader.next_char()
+        if separator == "}":
+            return
+        if separator != ",":
+            raise ValueError(f"Expected ',' or '}}' after '{field}', found '{separator}'")
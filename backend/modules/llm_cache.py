@@ -0,0 +1,170 @@
+"""
+modules/llm_cache.py - Content-addressed cache of LLM responses
+
+Parsed JSON answers of the model are cached in memory (LRU) and on disk.
+The key is a hash of the canonicalized input data, the request kind, the
+product type, the model name and PROMPT_VERSION. When a bank file changes,
+its data changes and so does the key: stale answers are never served and
+simply age out by TTL and size-bounded eviction.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from modules.utils import load_json_cache, save_json_cache
+
+logger = logging.getLogger(__name__)
+
+# Bump when prompt templates or the expected answer format change
+PROMPT_VERSION = 2
+
+DEFAULT_CACHE_DIR = os.getenv(
+    "LLM_CACHE_DIR",
+    str(Path(__file__).parent.parent / "cache" / "llm")
+)
+DEFAULT_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_HOURS", "24")) * 3600
+DEFAULT_MAX_BYTES = int(float(os.getenv("LLM_CACHE_MAX_MB", "32")) * 1024 * 1024)
+MEMORY_ENTRIES = 256
+
+
+def canonical_hash(payload: Any) -> str:
+    """Stable hash of JSON-like data: key order and whitespace do not matter"""
+    canonical = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Two-tier (memory LRU + disk) cache of parsed LLM answers with TTL"""
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        memory_entries: int = MEMORY_ENTRIES
+    ):
+        self.cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._memory: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def make_key(self, kind: str, inputs: Any, product_type: str, model: str) -> str:
+        return canonical_hash({
+            "kind": kind,
+            "inputs": inputs,
+            "product_type": product_type,
+            "model": model,
+            "prompt_version": PROMPT_VERSION,
+        })
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached answer or None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if now - entry[0] < self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return entry[1]
+                del self._memory[key]
+
+        payload = load_json_cache(f"{key}.json", str(self.cache_dir))
+        if payload is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        if now - payload.get("created_at", 0) >= self.ttl_seconds:
+            (self.cache_dir / f"{key}.json").unlink(missing_ok=True)
+            with self._lock:
+                self.expired += 1
+                self.misses += 1
+            return None
+
+        try:
+            # Touch the entry so eviction sees it as recently used
+            os.utime(self.cache_dir / f"{key}.json")
+        except OSError:
+            pass
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, payload["created_at"], payload["value"])
+        return payload["value"]
+
+    def set(self, key: str, value: Any):
+        created_at = time.time()
+        with self._lock:
+            self._remember(key, created_at, value)
+        try:
+            save_json_cache({"created_at": created_at, "value": value}, f"{key}.json", str(self.cache_dir))
+            self._evict()
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not persist LLM answer {key[:12]}: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        for path in self.cache_dir.glob("*.json"):
+            path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            total = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+                "hit_rate": round(hits / total, 4) if total else 0.0,
+            }
+
+    def _remember(self, key: str, created_at: float, value: Any):
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _evict(self):
+        """Remove least recently used files while the directory exceeds max_bytes"""
+        files = []
+        total = 0
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+
+@lru_cache
+def get_llm_cache() -> LLMResponseCache:
+    """Get the process-wide LLM answer cache"""
+    return LLMResponseCache()
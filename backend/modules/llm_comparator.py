@@ -8,10 +8,12 @@ import os
 import json
 import logging
 from typing import Dict, Any, List, Optional
-import pandas as pd
 from pathlib import Path
 from dotenv import load_dotenv, find_dotenv
 
+from modules.comparison_table import ComparisonTable
+from modules.llm_cache import LLMResponseCache, get_llm_cache
+
 project_root = Path(__file__).parent.absolute()
 env_path = project_root / '.env'
 load_dotenv(dotenv_path=env_path, override=True)
@@ -21,13 +23,20 @@ logger = logging.getLogger(__name__)
 class LLMComparator:
     """LLM-powered product comparator that adapts to available data"""
 
-    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        cache: Optional[LLMResponseCache] = None
+    ):
         """
         Initialize LLM comparator with OpenRouter support.
         Args:
             api_key: API key (defaults to OPENROUTER_API_KEY or OPENAI_API_KEY)
             base_url: API base URL (defaults to OpenRouter if not specified)
+            cache: Answer cache (defaults to the process-wide LLM cache)
         """
+        self.cache = cache or get_llm_cache()
         # Prioritize OpenRouter key, fall back to OpenAI key
         self.api_key = "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"
         # Default to OpenRouter if no base_url is provided
@@ -92,14 +101,14 @@ class LLMComparator:
             )
 
             # Step 3: Create comparison dataframe
-            comparison_df = self._create_comparison_table(comparison_structure)
+            comparison_table = self._create_comparison_table(comparison_structure)
 
             # Step 4: Extract advantages
             sber_advantages = comparison_structure.get("sber_advantages", [])
             competitor_advantages = comparison_structure.get("competitor_advantages", [])
 
             return {
-                "comparison_table": comparison_df,
+                "comparison_table": comparison_table,
                 "insights": insights,
                 "sber_advantages": sber_advantages,
                 "competitor_advantages": competitor_advantages,
@@ -128,23 +137,14 @@ class LLMComparator:
             sber_data, competitor_data, product_type, competitor_name
         )
 
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "Вы - эксперт по банковским продуктам. Ваша задача - сравнить два продукта и выделить ключевые параметры для сравнения. Отвечайте на русском языке в формате JSON."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            response_format={"type": "json_object"},
+        result = self.complete_json(
+            kind="comparison_structure",
+            inputs={"sber": sber_data, "competitor": competitor_data, "competitor_name": competitor_name},
+            product_type=product_type,
+            system_prompt="Вы - эксперт по банковским продуктам. Ваша задача - сравнить два продукта и выделить ключевые параметры для сравнения. Отвечайте на русском языке в формате JSON.",
+            prompt=prompt,
             temperature=0.3  # Lower temperature for more consistent output
         )
-
-        result = json.loads(response.choices[0].message.content)
         logger.info(f"LLM comparison structure: {len(result.get('parameters', []))} parameters found")
         
         return result
@@ -248,49 +248,87 @@ class LLMComparator:
 """
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Вы - финансовый аналитик. Генерируйте краткие, информативные выводы."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                response_format={"type": "json_object"},
+            result = self.complete_json(
+                kind="insights",
+                inputs={"comparison": comparison_structure, "competitor_name": competitor_name},
+                product_type=product_type,
+                system_prompt="Вы - финансовый аналитик. Генерируйте краткие, информативные выводы.",
+                prompt=prompt,
                 temperature=0.5
             )
-
-            result = json.loads(response.choices[0].message.content)
             return result.get("insights", [])
 
         except Exception as e:
             logger.error(f"Failed to generate insights: {e}")
             return ["⚠️ Не удалось сгенерировать выводы"]
 
-    def _create_comparison_table(self, comparison_structure: Dict[str, Any]) -> pd.DataFrame:
+    def complete_json(
+        self,
+        kind: str,
+        inputs: Any,
+        product_type: str,
+        system_prompt: str,
+        prompt: str,
+        temperature: float
+    ) -> Dict[str, Any]:
+        """
+        Ask the model for a JSON answer, served from the cache when the same
+        request kind was already answered for identical input data.
+
+        Args:
+            kind: Request kind, part of the cache key
+            inputs: Data the prompt is built from, part of the cache key
+            product_type: Type of product
+            system_prompt: System message
+            prompt: User message
+            temperature: Sampling temperature
+        """
+        key = self.cache.make_key(kind, inputs, product_type, self.model)
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.info(f"LLM cache hit: {kind} ({key[:12]})")
+            return cached
+
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": system_prompt
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            response_format={"type": "json_object"},
+            temperature=temperature
+        )
+
+        result = json.loads(response.choices[0].message.content)
+        self.cache.set(key, result)
+        return result
+
+    def _create_comparison_table(self, comparison_structure: Dict[str, Any]) -> ComparisonTable:
         """
-        Create pandas DataFrame from comparison structure.
+        Create comparison table from comparison structure.
         """
         parameters = comparison_structure.get("parameters", [])
         
         if not parameters:
-            return pd.DataFrame({
+            return ComparisonTable.from_columns({
                 "Параметр": ["Нет данных"],
                 "Сбер": ["Н/Д"],
                 "Конкурент": ["Н/Д"]
             })
 
-        df = pd.DataFrame({
+        table = ComparisonTable.from_columns({
             "Параметр": [p["name"] for p in parameters],
             "Сбер": [p["sber_value"] for p in parameters],
             "Конкурент": [p["competitor_value"] for p in parameters]
         })
         
-        return df
+        return table
 
     def _fallback_comparison(
         self,
@@ -303,14 +341,14 @@ class LLMComparator:
         # Get all unique keys from both datasets
         all_keys = set(sber_data.keys()) | set(competitor_data.keys())
         
-        comparison_df = pd.DataFrame({
+        comparison_table = ComparisonTable.from_columns({
             "Параметр": list(all_keys),
             "Сбер": [sber_data.get(k, "Н/Д") for k in all_keys],
             "Конкурент": [competitor_data.get(k, "Н/Д") for k in all_keys]
         })
         
         return {
-            "comparison_table": comparison_df,
+            "comparison_table": comparison_table,
             "insights": ["⚠️ LLM недоступен - базовое сравнение"],
             "sber_advantages": ["Требуется анализ"],
             "competitor_advantages": ["Требуется анализ"],
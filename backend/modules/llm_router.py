@@ -6,6 +6,8 @@ import json
 import logging
 from typing import Dict, Any, Optional
 
+from modules.bank_aliases import get_bank_index
+
 logger = logging.getLogger(__name__)
 
 class LLMRouter:
@@ -14,7 +16,7 @@ class LLMRouter:
     def __init__(self):
         self.request_types = ["urgent", "trends"]
         self.product_types = ["credit_card", "deposit", "consumer_loan"]
-        self.banks = ["ВТБ", "Альфа", "Газпром", "Райффайзен"]
+        self.bank_index = get_bank_index()
     
     def route_request(self, user_query: str) -> Dict[str, Any]:
         """
@@ -74,10 +76,10 @@ class LLMRouter:
     
     def _detect_banks(self, query: str) -> list:
         """Extract bank names from query"""
-        detected_banks = []
-        for bank in self.banks:
-            if bank.lower() in query:
-                detected_banks.append(bank)
+        detected_banks = [
+            self.bank_index.display_name(bank_id)
+            for bank_id in self.bank_index.find_in_text(query)
+        ]
         return detected_banks if detected_banks else ["ВТБ"]  # default
     
     def _detect_time_period(self, query: str) -> str:
@@ -4,29 +4,40 @@ modules/multi_bank_comparator.py - Multi-bank comparison functionality
 Compares multiple competitor banks against Sberbank as a reference.
 """
 import logging
+import os
 from typing import Dict, Any, List, Optional
-import pandas as pd
 import json
 from pathlib import Path
 from dotenv import load_dotenv
 
+from modules.async_data import get_executor
+from modules.comparison_table import ComparisonTable
+from modules.rule_engine import RuleEngine
+
 project_root = Path(__file__).parent.absolute()
 env_path = project_root / '.env'
 load_dotenv(dotenv_path=env_path, override=True)
 
 logger = logging.getLogger(__name__)
 
+# One structured request returns the table, advantages and insights together
+SINGLE_CALL = os.getenv("LLM_MULTI_SINGLE_CALL", "1").lower() not in ("0", "false", "no")
+
 class MultiBankComparator:
     """Compare multiple banks against Sberbank"""
 
-    def __init__(self, llm_comparator=None):
+    def __init__(self, llm_comparator=None, single_call: Optional[bool] = None):
         """
         Initialize multi-bank comparator.
         
         Args:
             llm_comparator: Optional LLMComparator instance for intelligent comparison
+            single_call: One model request per comparison (defaults to LLM_MULTI_SINGLE_CALL);
+                otherwise the structure and insights are requested concurrently
         """
         self.llm_comparator = llm_comparator
+        self.single_call = SINGLE_CALL if single_call is None else single_call
+        self.rule_engine = RuleEngine()
 
     def compare_multiple_banks(
         self,
@@ -62,7 +73,8 @@ class MultiBankComparator:
             return self._basic_multi_comparison(
                 sber_data,
                 competitor_data_list,
-                bank_names
+                bank_names,
+                product_type
             )
 
     def _llm_multi_comparison(
@@ -74,42 +86,55 @@ class MultiBankComparator:
     ) -> Dict[str, Any]:
         """
         Use LLM to intelligently compare multiple banks.
+
+        In single-call mode one request returns parameters, advantages,
+        highlights and insights. Otherwise insights are generated from the
+        raw data concurrently with the structure request.
         """
         try:
             prompt = self._build_multi_comparison_prompt(
                 sber_data,
                 competitor_data_list,
                 bank_names,
-                product_type
+                product_type,
+                with_insights=self.single_call
             )
 
-            response = self.llm_comparator.client.chat.completions.create(
-                model=self.llm_comparator.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Вы - эксперт по банковским продуктам. Ваша задача - сравнить продукт Сбербанка с несколькими конкурентами и выделить ключевые параметры для сравнения. Отвечайте на русском языке в формате JSON."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                response_format={"type": "json_object"},
+            insights_future = None
+            if not self.single_call:
+                bank_data = {"Сбербанк": sber_data, **dict(zip(bank_names, competitor_data_list))}
+                # Second model call goes to the shared blocking pool
+                insights_future = get_executor().submit(
+                    self._generate_multi_bank_insights, bank_data, bank_names, product_type
+                )
+
+            result = self.llm_comparator.complete_json(
+                kind="multi_comparison_with_insights" if self.single_call else "multi_comparison",
+                inputs={"sber": sber_data, "competitors": list(zip(bank_names, competitor_data_list))},
+                product_type=product_type,
+                system_prompt="Вы - эксперт по банковским продуктам. Ваша задача - сравнить продукт Сбербанка с несколькими конкурентами и выделить ключевые параметры для сравнения. Отвечайте на русском языке в формате JSON.",
+                prompt=prompt,
                 temperature=0.3
             )
-
-            result = json.loads(response.choices[0].message.content)
             logger.info(f"LLM multi-bank comparison: {len(result.get('parameters', []))} parameters found")
 
             # Create comparison table
-            comparison_df = self._create_multi_bank_table(result, bank_names)
-
-            # Generate insights
-            insights = self._generate_multi_bank_insights(result, bank_names, product_type)
+            comparison_table = self._create_multi_bank_table(result, bank_names)
+
+            if insights_future is not None:
+                # Not started yet (pool busy): run it here instead of waiting for a worker
+                if insights_future.cancel():
+                    insights = self._generate_multi_bank_insights(bank_data, bank_names, product_type)
+                else:
+                    insights = insights_future.result()
+            elif result.get("insights"):
+                insights = result["insights"]
+            else:
+                # The model skipped insights: ask for them separately
+                insights = self._generate_multi_bank_insights(result, bank_names, product_type)
 
             return {
-                "comparison_table": comparison_df,
+                "comparison_table": comparison_table,
                 "insights": insights,
                 "sber_advantages": result.get("sber_advantages", []),
                 "competitor_highlights": result.get("competitor_highlights", {}),
@@ -122,7 +147,8 @@ class MultiBankComparator:
             return self._basic_multi_comparison(
                 sber_data,
                 competitor_data_list,
-                bank_names
+                bank_names,
+                product_type
             )
 
     def _build_multi_comparison_prompt(
@@ -130,10 +156,12 @@ class MultiBankComparator:
         sber_data: Dict[str, Any],
         competitor_data_list: List[Dict[str, Any]],
         bank_names: List[str],
-        product_type: str
+        product_type: str,
+        with_insights: bool = False
     ) -> str:
         """
         Build prompt for LLM to structure multi-bank comparison.
+        With with_insights the answer also carries 4-6 key insights.
         """
         product_type_ru = {
             "credit_card": "кредитная карта",
@@ -146,6 +174,20 @@ class MultiBankComparator:
         for i, (bank_name, data) in enumerate(zip(bank_names, competitor_data_list), 1):
             competitors_data += f"\n**Данные {bank_name}:**\n```json\n{json.dumps(data, ensure_ascii=False, indent=2)}\n```\n"
 
+        insights_task = ""
+        insights_format = ""
+        insights_rules = ""
+        if with_insights:
+            insights_task = "6. Сформулируйте 4-6 ключевых выводов\n"
+            insights_format = """,
+    "insights": [
+        "✓ Первый вывод",
+        "⚠️ Второй вывод"
+    ]"""
+            insights_rules = """- Выводы: краткие (1 строка), начинаются с ✓ (позитивные) или ⚠️ (предупреждения),
+  содержат конкретные цифры и упоминают конкретные банки
+"""
+
         return f"""Сравните продукт Сбербанка типа \"{product_type_ru}\" с несколькими конкурентами.
 
 **Данные Сбербанка:**
@@ -159,7 +201,7 @@ class MultiBankComparator:
 3. Найдите преимущества Сбербанка
 4. Найдите самые конкурентные предложения среди конкурентов
 5. Дайте общую рекомендацию
-
+{insights_task}
 **Верните JSON в следующем формате:**
 {{
     "parameters": [
@@ -186,7 +228,7 @@ class MultiBankComparator:
             "• Сильная сторона 1"
         ]
     }},
-    "recommendation": "Общая рекомендация по результатам сравнения (2-3 предложения)"
+    "recommendation": "Общая рекомендация по результатам сравнения (2-3 предложения)"{insights_format}
 }}
 
 **Правила:**
@@ -195,7 +237,7 @@ class MultiBankComparator:
 - Для процентных ставок: меньше = лучше для кредитов, больше = лучше для вкладов
 - Для комиссий и стоимости: меньше = лучше
 - Будьте объективны и конкретны
-- Форматируйте текст используя Markdown:
+{insights_rules}- Форматируйте текст используя Markdown:
   - Выделяйте ключевые цифры и названия жирным шрифтом (**текст**)
   - Используйте эмодзи, где уместно
 """
@@ -204,14 +246,14 @@ class MultiBankComparator:
         self,
         comparison_structure: Dict[str, Any],
         bank_names: List[str]
-    ) -> pd.DataFrame:
+    ) -> ComparisonTable:
         """
-        Create pandas DataFrame from multi-bank comparison structure.
+        Create comparison table from multi-bank comparison structure.
         """
         parameters = comparison_structure.get("parameters", [])
 
         if not parameters:
-            return pd.DataFrame({
+            return ComparisonTable.from_columns({
                 "Параметр": ["Нет данных"],
                 "Сбербанк": ["Н/Д"],
                 **{bank: ["Н/Д"] for bank in bank_names}
@@ -230,8 +272,8 @@ class MultiBankComparator:
                 for p in parameters
             ]
 
-        df = pd.DataFrame(table_data)
-        return df
+        table = ComparisonTable.from_columns(table_data)
+        return table
 
     def _generate_multi_bank_insights(
         self,
@@ -240,9 +282,12 @@ class MultiBankComparator:
         product_type: str
     ) -> List[str]:
         """
-        Generate insights from multi-bank comparison using LLM.
+        Generate insights using LLM.
+
+        Args:
+            comparison_structure: Structured comparison or raw product data by bank
         """
-        prompt = f"""На основе следующего многобанковского сравнения, сгенерируйте 4-6 ключевых выводов:
+        prompt = f"""На основе следующих данных многобанковского сравнения, сгенерируйте 4-6 ключевых выводов:
 
 ```json
 {json.dumps(comparison_structure, ensure_ascii=False, indent=2)}
@@ -267,23 +312,14 @@ class MultiBankComparator:
 """
 
         try:
-            response = self.llm_comparator.client.chat.completions.create(
-                model=self.llm_comparator.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Вы - финансовый аналитик. Генерируйте краткие, информативные выводы о многобанковском сравнении."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                response_format={"type": "json_object"},
+            result = self.llm_comparator.complete_json(
+                kind="multi_insights",
+                inputs={"comparison": comparison_structure, "banks": list(bank_names)},
+                product_type=product_type,
+                system_prompt="Вы - финансовый аналитик. Генерируйте краткие, информативные выводы о многобанковском сравнении.",
+                prompt=prompt,
                 temperature=0.5
             )
-
-            result = json.loads(response.choices[0].message.content)
             return result.get("insights", [])
 
         except Exception as e:
@@ -294,37 +330,84 @@ class MultiBankComparator:
         self,
         sber_data: Dict[str, Any],
         competitor_data_list: List[Dict[str, Any]],
-        bank_names: List[str]
+        bank_names: List[str],
+        product_type: str = "credit_card"
     ) -> Dict[str, Any]:
         """
-        Fallback to basic multi-bank comparison when LLM is unavailable.
+        Rule-based multi-bank comparison when LLM is unavailable.
+        Key numeric parameters are ranked by the rule engine, raw fields are appended as is.
         """
-        # Get all unique keys from all datasets
-        all_keys = set(sber_data.keys())
-        for data in competitor_data_list:
-            all_keys.update(data.keys())
-
-        # Build comparison table
+        banks = ["Сбербанк"] + list(bank_names)
+        try:
+            result = self.rule_engine.compare(banks, [sber_data] + list(competitor_data_list), product_type)
+        except ValueError as e:
+            # No rules for this product type: only raw fields are compared
+            logger.warning(f"{e}; showing raw fields only")
+            result = self.rule_engine.compare_records(banks, [], [])
+        rules, records, ranks, best = result["rules"], result["records"], result["ranks"], result["best"]
+
+        # Ranked parameters first
         table_data = {
-            "Параметр": list(all_keys),
-            "Сбербанк": [sber_data.get(k, "Н/Д") for k in all_keys]
+            "Параметр": [rule.label for rule in rules],
+            "Сбербанк": [getattr(records[0], rule.display_field) for rule in rules]
         }
+        for i, bank_name in enumerate(bank_names, 1):
+            table_data[bank_name] = [getattr(records[i], rule.display_field) for rule in rules]
 
-        # Add columns for each competitor
+        # Then all unique raw keys from all datasets
+        all_keys = set(sber_data.keys())
+        for data in competitor_data_list:
+            all_keys.update(data.keys())
+        table_data["Параметр"].extend(all_keys)
+        table_data["Сбербанк"].extend(sber_data.get(k, "Н/Д") for k in all_keys)
         for i, bank_name in enumerate(bank_names):
-            table_data[bank_name] = [
-                competitor_data_list[i].get(k, "Н/Д")
-                for k in all_keys
-            ]
-
-        comparison_df = pd.DataFrame(table_data)
+            table_data[bank_name].extend(competitor_data_list[i].get(k, "Н/Д") for k in all_keys)
+
+        comparison_table = ComparisonTable.from_columns(table_data)
+
+        insights = []
+        sber_advantages = []
+        competitor_highlights = {bank: [] for bank in bank_names}
+        for col, rule in enumerate(rules):
+            if best[col] < 0:
+                continue
+            best_value = getattr(records[best[col]], rule.display_field)
+            sber_value = getattr(records[0], rule.display_field)
+            if ranks[0, col] == 1:
+                insights.append(f"✓ **Сбербанк** лучший по параметру «{rule.label}»: **{sber_value}**")
+                sber_advantages.append(f"• {rule.label}: **{sber_value}**")
+            else:
+                insights.append(
+                    f"⚠️ **{banks[best[col]]}** выигрывает по параметру «{rule.label}»: "
+                    f"**{best_value}** против **{sber_value}** у Сбербанка"
+                )
+            for i, bank_name in enumerate(bank_names, 1):
+                if ranks[i, col] == 1:
+                    value = getattr(records[i], rule.display_field)
+                    competitor_highlights[bank_name].append(f"• {rule.label}: **{value}**")
+
+        compared = int((best >= 0).sum())
+        if compared:
+            scores = result["scores"]
+            leader = int(scores.argmax())
+            recommendation = (
+                f"По числовым параметрам лидирует **{banks[leader]}** "
+                f"(лучший по {round(scores[leader] * compared)} из {compared}). "
+                f"Сбербанк лучший по {round(scores[0] * compared)} из {compared} параметров."
+            )
+        else:
+            insights.append("⚠️ Нет числовых параметров для сравнения")
+            recommendation = "Недостаточно данных для автоматической рекомендации"
 
         return {
-            "comparison_table": comparison_df,
-            "insights": ["⚠️ LLM недоступен - базовое сравнение"],
-            "sber_advantages": ["Требуется анализ с LLM"],
-            "competitor_highlights": {bank: ["Требуется анализ с LLM"] for bank in bank_names},
-            "recommendation": "LLM недоступен для генерации рекомендации",
+            "comparison_table": comparison_table,
+            "insights": insights,
+            "sber_advantages": sber_advantages or ["Явных преимуществ по числовым параметрам не найдено"],
+            "competitor_highlights": {
+                bank: highlights or ["Явных преимуществ по числовым параметрам не найдено"]
+                for bank, highlights in competitor_highlights.items()
+            },
+            "recommendation": recommendation,
             "llm_powered": False
         }
 
@@ -333,7 +416,7 @@ class MultiBankComparator:
         Return empty comparison structure.
         """
         return {
-            "comparison_table": pd.DataFrame({
+            "comparison_table": ComparisonTable.from_columns({
                 "Параметр": ["Нет данных"],
                 "Сбербанк": ["Н/Д"]
             }),
@@ -0,0 +1,169 @@
+"""
+modules/normalization_cache.py - Persistent cache of normalized product records
+
+Normalized cards of every data file are stored on disk under a key built from
+the file content hash, the product type and NORMALIZER_VERSION. Restarted
+workers load these files instead of normalizing the market again. The cache
+directory is bounded in size; least recently used entries are evicted first.
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from modules.catalog import KIND_COMPARISON, ProductCatalog, card_key, get_catalog
+from modules.bank_aliases import alias_key, resolve_bank
+from modules.normalizer import NORMALIZER_VERSION, DataNormalizer
+from modules.records import RECORD_TYPES, NormalizedProduct
+from modules.utils import load_json_cache, save_json_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.getenv(
+    "BANK_DATA_NORMALIZED_CACHE_DIR",
+    str(Path(__file__).parent.parent / "cache" / "normalized")
+)
+DEFAULT_MAX_BYTES = int(float(os.getenv("BANK_DATA_NORMALIZED_CACHE_MAX_MB", "64")) * 1024 * 1024)
+# Entries kept in memory on top of the disk tier
+MEMORY_ENTRIES = 256
+
+
+class NormalizationCache:
+    """Disk-backed cache of normalized cards, one entry per (file, product type)"""
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        catalog: Optional[ProductCatalog] = None,
+        normalizer: Optional[DataNormalizer] = None
+    ):
+        self.cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+        self.catalog = catalog or get_catalog()
+        self.normalizer = normalizer or DataNormalizer()
+        self.hits = 0
+        self.misses = 0
+        self._memory: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def entry_name(self, file_hash: str, product_type: str) -> str:
+        return f"{file_hash}_{product_type}_v{NORMALIZER_VERSION}.json"
+
+    def get_file_entries(self, file_name: str, product_type: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Get normalized cards of one data file.
+
+        Returns:
+            Dict["<bank>|<card key>", {"normalized": {...}, "numeric": {...}}]
+        """
+        file_hash = self.catalog.get_file_hash(file_name)
+        if file_hash is None:
+            return {}
+        name = self.entry_name(file_hash, product_type)
+
+        with self._lock:
+            entries = self._memory.get(name)
+            if entries is not None:
+                self._memory.move_to_end(name)
+                self.hits += 1
+                return entries
+
+        payload = load_json_cache(name, str(self.cache_dir))
+        if payload is not None:
+            entries = payload.get("cards", {})
+            # Touch the entry so eviction sees it as recently used
+            try:
+                os.utime(self.cache_dir / name)
+            except OSError:
+                pass
+            self.hits += 1
+        else:
+            entries = self._normalize_file(file_name, product_type)
+            try:
+                save_json_cache({"file": file_name, "cards": entries}, name, str(self.cache_dir))
+                self._evict()
+            except OSError as e:
+                logger.warning(f"Could not persist normalized cards of {file_name}: {e}")
+            self.misses += 1
+
+        with self._lock:
+            self._memory[name] = entries
+            if len(self._memory) > MEMORY_ENTRIES:
+                self._memory.popitem(last=False)
+        return entries
+
+    def get_records(self, product_type: str) -> List[NormalizedProduct]:
+        """Get normalized records of all deduplicated catalog cards of a product type"""
+        record_type = RECORD_TYPES[product_type]
+        records = []
+        for catalog_record in self.catalog.iter_records(product_type):
+            entries = self.get_file_entries(catalog_record.sources[0], product_type)
+            entry = entries.get(f"{catalog_record.bank}|{card_key(catalog_record.name)}")
+            if entry is None:
+                records.append(self.normalizer.normalize_record(
+                    catalog_record.card, catalog_record.bank, product_type
+                ))
+                continue
+            normalized = entry["normalized"]
+            records.append(record_type(
+                **{name: normalized.get(name, "Н/Д") for name in record_type.DISPLAY_FIELDS},
+                **entry["numeric"]
+            ))
+        return records
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "memory_entries": len(self._memory)}
+
+    def _normalize_file(self, file_name: str, product_type: str) -> Dict[str, Dict[str, Any]]:
+        data = self.catalog.get_document(file_name) or {}
+        kind, bank, _ = self.catalog.get_file_info(file_name) or (None, None, None)
+
+        if kind == KIND_COMPARISON:
+            cards = [
+                (resolve_bank(bank_name) or alias_key(bank_name), card)
+                for bank_name, card in data.get("банки", {}).items()
+            ]
+        else:
+            cards = [(bank, card) for card in data.get("карты", [])]
+
+        entries = {}
+        for card_bank, card in cards:
+            if not isinstance(card, dict):
+                continue
+            record = self.normalizer.normalize_record(card, card_bank, product_type)
+            name = card.get("название", card.get("карта", ""))
+            entries[f"{card_bank}|{card_key(name)}"] = {
+                "normalized": record.to_dict(),
+                "numeric": record.numeric(),
+            }
+        return entries
+
+    def _evict(self):
+        """Remove least recently used entries while the directory exceeds max_bytes"""
+        files = []
+        total = 0
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            logger.info(f"Evicted normalized cache entry {path.name}")
+
+
+@lru_cache
+def get_normalization_cache() -> NormalizationCache:
+    """Get the process-wide normalization cache"""
+    return NormalizationCache()
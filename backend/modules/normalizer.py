@@ -6,105 +6,117 @@ individual bank files and comparison files.
 """
 
 import logging
-from typing import Dict, Any, Optional
+import math
+from array import array
+from typing import Dict, Any, Iterable, List, Optional, Tuple, Union
 
 from modules.utils import normalize_rate, extract_number
-from configs.field_mappings import (
-    get_mapping_for_product,
-    get_all_possible_field_names,
-    NESTED_FIELD_HANDLERS
-)
+from modules.records import RECORD_TYPES, NormalizedProduct, numeric_bound
+from configs.field_mappings import get_extraction_sources
 
 logger = logging.getLogger(__name__)
 
+# Bump when normalization output changes, so persisted results are recomputed
+NORMALIZER_VERSION = 3
+
 
 class DataNormalizer:
     """Нормализация различных форматов данных к единой схеме."""
 
     def normalize_credit_card(self, raw_data: Dict[str, Any], bank: str) -> Dict[str, Any]:
         """Нормализация данных кредитной карты."""
-        return self._normalize_with_mapping(raw_data, bank, "credit_card", {
-            "product_name": self._get_product_name,
-            "interest_rate": self._get_interest_rate,
-            "grace_period": self._get_grace_period,
-            "cashback": self._get_cashback,
-            "annual_fee": self._get_annual_fee,
-            "max_limit": self._get_max_limit,
-            "min_payment": self._get_min_payment,
-            "min_salary_requirement": lambda d: d.get("мин_зарплата", "Н/Д"),
-            "commission": lambda d: d.get("комиссия", "Н/Д"),
-        })
+        return self._normalize_with_plan(raw_data, bank, "credit_card")
 
     def normalize_debit_card(self, raw_data: Dict[str, Any], bank: str) -> Dict[str, Any]:
         """
         Нормализация данных дебетовой карты.
         Дебетовые карты имеют процент на остаток вместо процентной ставки.
         """
-        return self._normalize_with_mapping(raw_data, bank, "debit_card", {
-            "product_name": self._get_product_name,
-            "annual_fee": self._get_annual_fee,
-            "interest_on_balance": self._get_interest_rate,  # Процент на остаток
-            "cashback": self._get_cashback,
-            "loyalty_program": lambda d: d.get("программа_лояльности", "Н/Д"),
-            "sms_notifications": lambda d: d.get("смс", "Н/Д"),
-            "withdrawals": self._get_withdrawals,
-            "transfers": self._get_transfers,
-            "monthly_limit": lambda d: d.get("лимит_месячный", "Н/Д"),
-        })
+        return self._normalize_with_plan(raw_data, bank, "debit_card")
 
     def normalize_deposit(self, raw_data: Dict[str, Any], bank: str) -> Dict[str, Any]:
         """
         Нормализация данных вклада.
         """
-        return self._normalize_with_mapping(raw_data, bank, "deposit", {
-            "product_name": self._get_product_name,
-            "interest_rate": self._get_interest_rate,
-            "term_months": lambda d: d.get("срок", "Н/Д"),
-            "min_amount": lambda d: d.get("минимальная_сумма", "Н/Д"),
-            "max_amount": lambda d: d.get("максимальная_сумма", "Н/Д"),
-            "replenishment": lambda d: d.get("пополнение", "Н/Д"),
-            "early_withdrawal": lambda d: d.get("досрочное_снятие", "Н/Д"),
-            "insurance": lambda d: d.get("страхование", "Н/Д"),
-        })
+        return self._normalize_with_plan(raw_data, bank, "deposit")
 
     def normalize_consumer_loan(self, raw_data: Dict[str, Any], bank: str) -> Dict[str, Any]:
         """
         Нормализация данных потребительского кредита.
         """
-        return self._normalize_with_mapping(raw_data, bank, "consumer_loan", {
-            "product_name": self._get_product_name,
-            "interest_rate": self._get_interest_rate,
-            "max_amount": self._get_max_limit,
-            "term_months": lambda d: d.get("срок", "Н/Д"),
-            "commission": lambda d: d.get("комиссия", "Н/Д"),
-            "approval_time": lambda d: d.get("время_одобрения", "Н/Д"),
-            "min_score": lambda d: d.get("мин_скор", "Н/Д"),
-        })
-
-    def _normalize_with_mapping(
+        return self._normalize_with_plan(raw_data, bank, "consumer_loan")
+
+    def normalize(self, raw_data: Dict[str, Any], bank: str, product_type: str) -> Dict[str, Any]:
+        """Нормализация по коду типа продукта (credit_card, debit_card, deposit, consumer_loan)."""
+        if product_type not in NORMALIZATION_PLANS:
+            raise ValueError(f"Unknown product type: {product_type}")
+        return self._normalize_with_plan(raw_data, bank, product_type)
+
+    def normalize_record(self, raw_data: Dict[str, Any], bank: str, product_type: str) -> NormalizedProduct:
+        """
+        Нормализация в компактную запись со слотами.
+        Помимо строк для отображения запись содержит числовые поля (ставки, суммы, дни).
+        """
+        return RECORD_TYPES[product_type].from_normalized(self.normalize(raw_data, bank, product_type))
+
+    def normalize_many(
+        self,
+        records: Iterable[Tuple[Dict[str, Any], str]],
+        product_type: str
+    ) -> Dict[str, Union[List[Any], array]]:
+        """
+        Пакетная нормализация в колоночный формат.
+        
+        Args:
+            records: Пары (исходные данные, банк)
+            product_type: Тип продукта (credit_card, debit_card, deposit, consumer_loan)
+        
+        Returns:
+            Dict колонок: строковые поля - списки, числовые поля - array('d')
+            с NaN для отсутствующих значений
+        """
+        if product_type not in NORMALIZATION_PLANS:
+            raise ValueError(f"Unknown product type: {product_type}")
+        
+        record_type = RECORD_TYPES[product_type]
+        columns: Dict[str, Union[List[Any], array]] = {name: [] for name in record_type.DISPLAY_FIELDS}
+        numeric_columns = {name: array("d") for name in record_type.NUMERIC_FIELDS}
+        
+        for raw_data, bank in records:
+            normalized = self._normalize_with_plan(raw_data, bank, product_type)
+            for name, column in columns.items():
+                column.append(normalized.get(name, "Н/Д"))
+            for name, (source, bound) in record_type.NUMERIC_FIELDS.items():
+                value = numeric_bound(normalized.get(source), bound)
+                numeric_columns[name].append(math.nan if value is None else value)
+        
+        columns.update(numeric_columns)
+        return columns
+
+    def _normalize_with_plan(
         self,
         raw_data: Dict[str, Any],
         bank: str,
-        product_type: str,
-        field_extractors: Dict[str, callable]
+        product_type: str
     ) -> Dict[str, Any]:
         """
-        Общая нормализация с использованием field mappings и extractors.
+        Общая нормализация по скомпилированному плану извлечения.
         
         Args:
             raw_data: Исходные данные из JSON файла
             bank: Название банка
             product_type: Тип продукта (credit_card, debit_card, deposit, и т.д.)
-            field_extractors: Dict из field_name -> extraction_function
         
         Returns:
             Нормализованный dict с данными
         """
+        plan = NORMALIZATION_PLANS[product_type]
+        source_keys = _resolve_source_keys(product_type, plan, raw_data)
         normalized = {"bank": bank}
         
-        for field_name, extractor in field_extractors.items():
+        for (field_name, _, formatter), source_key in zip(plan, source_keys):
             try:
-                value = extractor(raw_data)
+                value = formatter(self, raw_data[source_key] if source_key is not None else None)
                 normalized[field_name] = value if value is not None else "Н/Д"
             except Exception as e:
                 logger.warning(f"Error extracting {field_name} for {bank}: {e}")
@@ -112,102 +124,6 @@ class DataNormalizer:
         
         return normalized
 
-    def _get_field_value(self, data: Dict[str, Any], field_aliases: list) -> Any:
-        """
-        Получить значение поля, пробуя несколько возможных имен.
-        
-        Args:
-            data: Исходные данные dict
-            field_aliases: Список возможных имен полей
-        
-        Returns:
-            Значение поля или None если не найдено
-        """
-        for alias in field_aliases:
-            if alias in data:
-                return data[alias]
-        return None
-
-    # ========================================================================
-    # FIELD EXTRACTION METHODS
-    # ========================================================================
-
-    def _get_product_name(self, data: Dict[str, Any]) -> str:
-        """Извлечь название продукта из различных полей."""
-        name = self._get_field_value(data, ["название", "карта", "product_name"])
-        return str(name) if name else "Н/Д"
-
-    def _get_interest_rate(self, data: Dict[str, Any]) -> str:
-        """Извлечь и отформатировать процентную ставку."""
-        rate = self._get_field_value(data, [
-            "ставка", 
-            "процент", 
-            "процент_на_остаток",
-            "interest_rate"
-        ])
-        return self._format_rate(rate)
-
-    def _get_grace_period(self, data: Dict[str, Any]) -> str:
-        """Извлечь и отформатировать льготный период (обрабатывает dict и string)."""
-        grace = self._get_field_value(data, ["грейс_период", "grace_period"])
-        
-        if isinstance(grace, dict):
-            # Handle nested structure like {"покупки": "120 дней"}
-            period = grace.get('покупки', grace.get('purchases', "Н/Д"))
-            return self._format_period(period)
-        
-        return self._format_period(grace)
-
-    def _get_cashback(self, data: Dict[str, Any]) -> str:
-        """Извлечь и отформатировать кэшбэк."""
-        cashback = self._get_field_value(data, ["кешбек", "cashback"])
-        return self._format_cashback(cashback)
-
-    def _get_annual_fee(self, data: Dict[str, Any]) -> str:
-        """Извлечь и отформатировать годовую плату."""
-        fee = self._get_field_value(data, [
-            "стоимость",
-            "стоимость_обслуживания",
-            "annual_fee"
-        ])
-        return self._format_fee(fee)
-
-    def _get_max_limit(self, data: Dict[str, Any]) -> str:
-        """Извлечь и отформатировать максимальный лимит/сумму."""
-        limit = self._get_field_value(data, [
-            "лимит",
-            "кредитный_лимит",
-            "максимальный_лимит",
-            "max_limit"
-        ])
-        return self._format_amount(limit)
-
-    def _get_min_payment(self, data: Dict[str, Any]) -> str:
-        """Извлечь минимальный платеж."""
-        min_pay = self._get_field_value(data, [
-            "минимальный_платеж",
-            "min_payment"
-        ])
-        return str(min_pay) if min_pay else "Н/Д"
-
-    def _get_withdrawals(self, data: Dict[str, Any]) -> str:
-        """Извлечь информацию о снятии наличных."""
-        withdrawals = self._get_field_value(data, ["снятие_наличных", "withdrawals"])
-        if isinstance(withdrawals, dict):
-            # Форматировать dict в читабельную строку
-            parts = [f"{k}: {v}" for k, v in withdrawals.items()]
-            return "; ".join(parts)
-        return str(withdrawals) if withdrawals else "Н/Д"
-
-    def _get_transfers(self, data: Dict[str, Any]) -> str:
-        """Извлечь информацию о переводах."""
-        transfers = self._get_field_value(data, ["переводы", "transfers"])
-        if isinstance(transfers, dict):
-            # Форматировать dict в читабельную строку
-            parts = [f"{k}: {v}" for k, v in transfers.items()]
-            return "; ".join(parts)
-        return str(transfers) if transfers else "Н/Д"
-
     # ========================================================================
     # FORMATTING METHODS
     # ========================================================================
@@ -239,10 +155,26 @@ class DataNormalizer:
     def _format_grace_period(self, value: Any) -> str:
         """Форматировать льготный период, обрабатывая dict структуры."""
         if isinstance(value, dict):
-            period = value.get('покупки', "Н/Д")
+            # Handle nested structure like {"покупки": "120 дней"}
+            period = value.get('покупки', value.get('purchases', "Н/Д"))
             return self._format_period(period)
         return self._format_period(value)
 
+    def _format_text(self, value: Any) -> str:
+        """Строковое значение или Н/Д для пустых."""
+        return str(value) if value else "Н/Д"
+
+    def _format_raw(self, value: Any) -> Any:
+        """Значение без изменений."""
+        return value
+
+    def _format_details(self, value: Any) -> str:
+        """Форматировать dict (снятие наличных, переводы) в читабельную строку."""
+        if isinstance(value, dict):
+            parts = [f"{k}: {v}" for k, v in value.items()]
+            return "; ".join(parts)
+        return str(value) if value else "Н/Д"
+
     def _format_period(self, value: Any) -> str:
         """Форматировать временной период (дни, месяцы, и т.д.)."""
         if value is None or value == "Н/Д":
@@ -333,3 +265,86 @@ class DataNormalizer:
                 return "Нет"
         
         return "Н/Д"
+
+
+# ============================================================================
+# NORMALIZATION PLANS
+# ============================================================================
+
+# product type -> ((target field, alias group, formatter), ...)
+_PLAN_SPECS = {
+    "credit_card": (
+        ("product_name", "product_name", DataNormalizer._format_text),
+        ("interest_rate", "interest_rate", DataNormalizer._format_rate),
+        ("grace_period", "grace_period", DataNormalizer._format_grace_period),
+        ("cashback", "cashback", DataNormalizer._format_cashback),
+        ("annual_fee", "annual_fee", DataNormalizer._format_fee),
+        ("max_limit", "max_limit", DataNormalizer._format_amount),
+        ("min_payment", "min_payment", DataNormalizer._format_text),
+        ("min_salary_requirement", "min_salary_requirement", DataNormalizer._format_raw),
+        ("commission", "commission", DataNormalizer._format_raw),
+    ),
+    "debit_card": (
+        ("product_name", "product_name", DataNormalizer._format_text),
+        ("annual_fee", "annual_fee", DataNormalizer._format_fee),
+        ("interest_on_balance", "interest_rate", DataNormalizer._format_rate),  # Процент на остаток
+        ("cashback", "cashback", DataNormalizer._format_cashback),
+        ("loyalty_program", "loyalty_program", DataNormalizer._format_raw),
+        ("sms_notifications", "sms_notifications", DataNormalizer._format_raw),
+        ("withdrawals", "withdrawals", DataNormalizer._format_details),
+        ("transfers", "transfers", DataNormalizer._format_details),
+        ("monthly_limit", "monthly_limit", DataNormalizer._format_raw),
+    ),
+    "deposit": (
+        ("product_name", "product_name", DataNormalizer._format_text),
+        ("interest_rate", "interest_rate", DataNormalizer._format_rate),
+        ("term_months", "term_months", DataNormalizer._format_raw),
+        ("min_amount", "min_amount", DataNormalizer._format_raw),
+        ("max_amount", "max_amount", DataNormalizer._format_raw),
+        ("replenishment", "replenishment", DataNormalizer._format_raw),
+        ("early_withdrawal", "early_withdrawal", DataNormalizer._format_raw),
+        ("insurance", "insurance", DataNormalizer._format_raw),
+    ),
+    "consumer_loan": (
+        ("product_name", "product_name", DataNormalizer._format_text),
+        ("interest_rate", "interest_rate", DataNormalizer._format_rate),
+        ("max_amount", "max_limit", DataNormalizer._format_amount),
+        ("term_months", "term_months", DataNormalizer._format_raw),
+        ("commission", "commission", DataNormalizer._format_raw),
+        ("approval_time", "approval_time", DataNormalizer._format_raw),
+        ("min_score", "min_score", DataNormalizer._format_raw),
+    ),
+}
+
+
+def _compile_plans() -> Dict[str, Tuple]:
+    """Resolve alias groups into flat (target field, source keys, formatter) steps"""
+    return {
+        product_type: tuple(
+            (field_name, tuple(get_extraction_sources(alias_group, field_name, product_type)), formatter)
+            for field_name, alias_group, formatter in spec
+        )
+        for product_type, spec in _PLAN_SPECS.items()
+    }
+
+
+NORMALIZATION_PLANS = _compile_plans()
+
+# (product type, record key layout) -> resolved source key per plan step.
+# Records from the same file share their layout, so aliases are probed once.
+_resolved_keys: Dict[Tuple[str, Tuple[str, ...]], Tuple[Optional[str], ...]] = {}
+_MAX_RESOLVED_LAYOUTS = 1024
+
+
+def _resolve_source_keys(product_type: str, plan: Tuple, raw_data: Dict[str, Any]) -> Tuple[Optional[str], ...]:
+    layout = (product_type, tuple(raw_data))
+    source_keys = _resolved_keys.get(layout)
+    if source_keys is None:
+        source_keys = tuple(
+            next((name for name in names if name in raw_data), None)
+            for _, names, _ in plan
+        )
+        if len(_resolved_keys) >= _MAX_RESOLVED_LAYOUTS:
+            _resolved_keys.clear()
+        _resolved_keys[layout] = source_keys
+    return source_keys
@@ -0,0 +1,280 @@
+"""
+modules/product_store.py - Pluggable storage backends for bank product data
+
+The default backend serves products straight from the in-memory catalog.
+The optional SQLite backend keeps products and cards in indexed tables,
+so lookups stay fast when the data set grows to thousands of products.
+
+Backend is selected with the BANK_DATA_STORE environment variable:
+    BANK_DATA_STORE=catalog                 (default)
+    BANK_DATA_STORE=sqlite:///path/to.db
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from modules.catalog import ProductCatalog, card_key, get_catalog
+
+logger = logging.getLogger(__name__)
+
+RU_MONTHS = {
+    "январь": 1, "февраль": 2, "март": 3, "апрель": 4, "май": 5, "июнь": 6,
+    "июль": 7, "август": 8, "сентябрь": 9, "октябрь": 10, "ноябрь": 11, "декабрь": 12,
+}
+
+_SNAPSHOT_DATE = re.compile(r"(?P<month>[а-яё]+)\s+(?P<year>\d{4})", re.IGNORECASE)
+
+
+def parse_snapshot_date(value: Any) -> Optional[str]:
+    """Convert "ноябрь 2025" to ISO date "2025-11-01"."""
+    match = _SNAPSHOT_DATE.search(str(value or ""))
+    if not match:
+        return None
+    month = RU_MONTHS.get(match.group("month").lower())
+    if not month:
+        return None
+    return f"{match.group('year')}-{month:02d}-01"
+
+
+class CatalogProductStore:
+    """Default backend: products are served from the in-memory catalog"""
+
+    def __init__(self, catalog: Optional[ProductCatalog] = None):
+        self.catalog = catalog or get_catalog()
+
+    def get_product(self, bank: str, product_type: str) -> Optional[Dict[str, Any]]:
+        """Get product file data by bank id and product type"""
+        return self.catalog.get_product(bank, product_type)
+
+    def get_card(self, bank: str, product_type: str, card_name: str) -> Optional[Dict[str, Any]]:
+        """Get a single card by bank id, product type and card name"""
+        return self.catalog.get_card(bank, product_type, card_name)
+
+
+class SQLiteProductStore:
+    """
+    SQLite backend with indexes on bank, product type and snapshot date.
+
+    With a catalog attached, every read first checks the catalog version and
+    re-imports the tables when the bank data files changed.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS products (
+            id INTEGER PRIMARY KEY,
+            bank TEXT NOT NULL,
+            product_type TEXT NOT NULL,
+            snapshot_date TEXT NOT NULL DEFAULT '',
+            source_file TEXT NOT NULL,
+            payload TEXT NOT NULL
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_products_lookup
+            ON products (bank, product_type, snapshot_date);
+        CREATE INDEX IF NOT EXISTS idx_products_type_date
+            ON products (product_type, snapshot_date);
+        CREATE TABLE IF NOT EXISTS cards (
+            id INTEGER PRIMARY KEY,
+            bank TEXT NOT NULL,
+            product_type TEXT NOT NULL,
+            card_key TEXT NOT NULL,
+            snapshot_date TEXT NOT NULL DEFAULT '',
+            sources TEXT NOT NULL,
+            payload TEXT NOT NULL
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_cards_lookup
+            ON cards (bank, product_type, card_key, snapshot_date);
+        CREATE TABLE IF NOT EXISTS files (
+            source_file TEXT PRIMARY KEY,
+            file_hash TEXT NOT NULL,
+            snapshot_date TEXT NOT NULL DEFAULT ''
+        );
+    """
+
+    # Statements are kept as constants so sqlite3 reuses the prepared versions
+    # from the per-connection statement cache
+    SELECT_PRODUCT = (
+        "SELECT payload FROM products WHERE bank = ? AND product_type = ? "
+        "ORDER BY snapshot_date DESC LIMIT 1"
+    )
+    SELECT_CARD = (
+        "SELECT payload FROM cards WHERE bank = ? AND product_type = ? AND card_key = ? "
+        "ORDER BY snapshot_date DESC LIMIT 1"
+    )
+    SELECT_SNAPSHOT_DATES = (
+        "SELECT DISTINCT snapshot_date FROM products WHERE bank = ? AND product_type = ? "
+        "ORDER BY snapshot_date"
+    )
+    UPSERT_PRODUCT = (
+        "INSERT OR REPLACE INTO products (bank, product_type, snapshot_date, source_file, payload) "
+        "VALUES (?, ?, ?, ?, ?)"
+    )
+    UPSERT_CARD = (
+        "INSERT OR REPLACE INTO cards (bank, product_type, card_key, snapshot_date, sources, payload) "
+        "VALUES (?, ?, ?, ?, ?, ?)"
+    )
+    UPSERT_FILE = "INSERT OR REPLACE INTO files (source_file, file_hash, snapshot_date) VALUES (?, ?, ?)"
+    # Cards built (also) from a given file within one snapshot
+    CARDS_OF_FILE = (
+        "FROM cards WHERE snapshot_date = ? "
+        "AND EXISTS (SELECT 1 FROM json_each(cards.sources) WHERE json_each.value = ?)"
+    )
+
+    def __init__(self, db_path: str, catalog: Optional[ProductCatalog] = None):
+        self.db_path = db_path
+        self.catalog = catalog
+        self._lock = threading.Lock()
+        self._import_lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=256)
+        self._conn.executescript(self.SCHEMA)
+        self._imported_version = self.catalog_version
+
+    @property
+    def catalog_version(self) -> Optional[str]:
+        """Version of the catalog the store was last imported from"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'catalog_version'").fetchone()
+        return row[0] if row else None
+
+    def ensure_current(self):
+        """Re-import the catalog if its files changed since the last import"""
+        if self.catalog is None:
+            return
+        self.catalog.refresh_if_changed()
+        if self._imported_version == self.catalog.version:
+            return
+        with self._import_lock:
+            if self._imported_version != self.catalog.version:
+                self.import_catalog(self.catalog)
+
+    def import_catalog(self, catalog: Optional[ProductCatalog] = None):
+        """
+        Sync the tables with the catalog in one transaction.
+
+        Only rows of files added, changed or removed since the last import are
+        rewritten, and only within the snapshot date they were imported with:
+        a file that moved on to a new date gets new rows next to the old ones,
+        so earlier snapshots stay available to get_snapshot_dates().
+        """
+        catalog = catalog or get_catalog()
+        version = catalog.version
+        # Every document can be a card source: file -> (hash, snapshot date)
+        current = {
+            file_name: (catalog.get_file_hash(file_name) or "", parse_snapshot_date(data.get("дата")) or "")
+            for file_name, data in list(catalog.documents.items())
+        }
+
+        with self._lock:
+            imported = {
+                row[0]: (row[1], row[2])
+                for row in self._conn.execute("SELECT source_file, file_hash, snapshot_date FROM files")
+            }
+        removed = [name for name in imported if name not in current]
+        changed = [name for name, entry in current.items()
+                   if name not in imported or imported[name][0] != entry[0]]
+        # Rows replaced in place: removed files and files still on the same date
+        stale = [(name, imported[name][1]) for name in removed]
+        stale += [(name, imported[name][1]) for name in changed
+                  if name in imported and imported[name][1] == current[name][1]]
+
+        with self._lock:
+            stale_cards = set()
+            for file_name, snapshot_date in stale:
+                stale_cards.update(self._conn.execute(
+                    f"SELECT bank, product_type, card_key {self.CARDS_OF_FILE}", (snapshot_date, file_name)
+                ).fetchall())
+
+        touched = set(removed) | set(changed)
+        products = [
+            (bank, product_type, current[file_name][1], file_name, json.dumps(data, ensure_ascii=False))
+            for file_name, bank, product_type, data in catalog.iter_products()
+            if file_name in touched
+        ]
+
+        cards = []
+        for record in catalog.iter_records():
+            key = card_key(record.name)
+            if touched.isdisjoint(record.sources) and (record.bank, record.product_type, key) not in stale_cards:
+                continue
+            source = catalog.get_document(record.sources[0]) or {}
+            cards.append((
+                record.bank,
+                record.product_type,
+                key,
+                parse_snapshot_date(source.get("дата")) or "",
+                json.dumps(record.sources, ensure_ascii=False),
+                json.dumps(record.card, ensure_ascii=False),
+            ))
+
+        with self._lock, self._conn:
+            for file_name, snapshot_date in stale:
+                self._conn.execute(
+                    "DELETE FROM products WHERE source_file = ? AND snapshot_date = ?",
+                    (file_name, snapshot_date)
+                )
+                self._conn.execute(f"DELETE {self.CARDS_OF_FILE}", (snapshot_date, file_name))
+            self._conn.executemany(self.UPSERT_PRODUCT, products)
+            self._conn.executemany(self.UPSERT_CARD, cards)
+            self._conn.executemany("DELETE FROM files WHERE source_file = ?", [(name,) for name in removed])
+            self._conn.executemany(self.UPSERT_FILE, [(name, *current[name]) for name in changed])
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('catalog_version', ?)",
+                (version,)
+            )
+        self._imported_version = version
+        logger.info(
+            f"Imported {len(products)} products and {len(cards)} cards into {self.db_path} "
+            f"({len(changed)} files changed, {len(removed)} removed)"
+        )
+
+    def get_product(self, bank: str, product_type: str) -> Optional[Dict[str, Any]]:
+        """Get the latest snapshot of a product"""
+        self.ensure_current()
+        with self._lock:
+            row = self._conn.execute(self.SELECT_PRODUCT, (bank, product_type)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_card(self, bank: str, product_type: str, card_name: str) -> Optional[Dict[str, Any]]:
+        """Get the latest snapshot of a single card"""
+        self.ensure_current()
+        with self._lock:
+            row = self._conn.execute(self.SELECT_CARD, (bank, product_type, card_key(card_name))).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_snapshot_dates(self, bank: str, product_type: str) -> List[str]:
+        """Get all stored snapshot dates of a product"""
+        self.ensure_current()
+        with self._lock:
+            rows = self._conn.execute(self.SELECT_SNAPSHOT_DATES, (bank, product_type)).fetchall()
+        return [row[0] for row in rows if row[0]]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+@lru_cache
+def get_product_store():
+    """Get the process-wide product store configured by BANK_DATA_STORE"""
+    store_url = os.getenv("BANK_DATA_STORE", "catalog")
+
+    if store_url.startswith("sqlite:///"):
+        db_path = store_url[len("sqlite:///"):]
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        store = SQLiteProductStore(db_path, catalog=get_catalog())
+        store.ensure_current()
+        return store
+
+    if store_url != "catalog":
+        logger.warning(f"Unknown BANK_DATA_STORE '{store_url}', using in-memory catalog")
+    return CatalogProductStore()
@@ -0,0 +1,210 @@
+"""
+modules/ranking_index.py - Sorted per-parameter index of the whole market
+
+For every (product type, numeric parameter) the cards of all banks are kept
+in a list sorted by value, so "lowest rate", "longest grace period" or
+"highest cashback" are answered with a slice and value ranges with bisect.
+Entries are grouped by source file: when the catalog changes, only files
+whose content hash or set of cards changed are re-indexed.
+"""
+
+import logging
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Any, FrozenSet, List, Optional, Tuple
+
+from modules.catalog import FILE_PRODUCT_TYPES, ProductCatalog, card_key
+from modules.rule_engine import HIGHER_IS_BETTER, LOWER_IS_BETTER, PRODUCT_RULES, ParameterRule
+from modules.normalization_cache import NormalizationCache, get_normalization_cache
+
+logger = logging.getLogger(__name__)
+
+# Parameters ranked on top of the comparison rules
+EXTRA_RULES: Dict[str, List[ParameterRule]] = {
+    "credit_card": [
+        ParameterRule("cashback_percent", "cashback", "Кэшбэк", HIGHER_IS_BETTER),
+    ],
+    "debit_card": [
+        ParameterRule("cashback_percent", "cashback", "Кэшбэк", HIGHER_IS_BETTER),
+    ],
+}
+
+
+def get_ranked_parameters(product_type: str) -> Dict[str, ParameterRule]:
+    """Rankable parameters of a product type by numeric field name"""
+    rules = PRODUCT_RULES.get(product_type, []) + EXTRA_RULES.get(product_type, [])
+    return {rule.field: rule for rule in rules}
+
+
+@dataclass(frozen=True, slots=True)
+class RankedCard:
+    """One card in a parameter ranking"""
+    value: float
+    bank: str
+    card: str
+    display: str
+    source: str
+
+
+class SortedColumn:
+    """Cards of one parameter sorted by value; values and cards are parallel lists"""
+
+    __slots__ = ("values", "cards")
+
+    def __init__(self):
+        self.values: List[float] = []
+        self.cards: List[RankedCard] = []
+
+    def add(self, card: RankedCard):
+        idx = bisect_right(self.values, card.value)
+        self.values.insert(idx, card.value)
+        self.cards.insert(idx, card)
+
+    def remove(self, card: RankedCard):
+        start = bisect_left(self.values, card.value)
+        end = bisect_right(self.values, card.value)
+        for idx in range(start, end):
+            if self.cards[idx] is card:
+                del self.values[idx]
+                del self.cards[idx]
+                return
+
+    def window(self, min_value: Optional[float], max_value: Optional[float]) -> Tuple[int, int]:
+        """Index range of cards with min_value <= value <= max_value"""
+        start = bisect_left(self.values, min_value) if min_value is not None else 0
+        end = bisect_right(self.values, max_value) if max_value is not None else len(self.values)
+        return start, max(start, end)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class RankingIndex:
+    """Per-parameter rankings of all catalog cards, updated file by file"""
+
+    def __init__(self, cache: Optional[NormalizationCache] = None):
+        self.cache = cache or get_normalization_cache()
+        self.catalog: ProductCatalog = self.cache.catalog
+        self.version = ""
+        self._columns: Dict[Tuple[str, str], SortedColumn] = {}
+        # file -> (signature, [(product type, field, card)])
+        self._files: Dict[str, Tuple[Tuple[str, FrozenSet[str]], List[Tuple[str, str, RankedCard]]]] = {}
+        self._lock = threading.Lock()
+
+    def ensure_current(self) -> bool:
+        """Re-index files changed since the last build. Returns True if anything changed."""
+        self.catalog.refresh_if_changed()
+        with self._lock:
+            if self.version == self.catalog.version:
+                return False
+            changed = self._update_locked()
+            self.version = self.catalog.version
+            return changed
+
+    def query(
+        self,
+        product_type: str,
+        field: str,
+        k: Optional[int] = None,
+        min_value: Optional[float] = None,
+        max_value: Optional[float] = None
+    ) -> List[RankedCard]:
+        """
+        Best cards by a parameter, best first.
+
+        Args:
+            product_type: credit_card or debit_card
+            field: numeric field, see get_ranked_parameters()
+            k: number of cards to return, None for all
+            min_value, max_value: optional value range (inclusive)
+        """
+        rule = get_ranked_parameters(product_type)[field]
+        self.ensure_current()
+        with self._lock:
+            column = self._columns.get((product_type, field))
+            if column is None:
+                return []
+            start, end = column.window(min_value, max_value)
+            if k is not None:
+                if rule.direction == LOWER_IS_BETTER:
+                    end = min(end, start + k)
+                else:
+                    start = max(start, end - k)
+            cards = column.cards[start:end]
+        return cards if rule.direction == LOWER_IS_BETTER else cards[::-1]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "version": self.version,
+                "files": len(self._files),
+                "columns": {f"{pt}.{field}": len(column) for (pt, field), column in self._columns.items()},
+            }
+
+    def _update_locked(self) -> bool:
+        # Deduplicated cards are indexed under their primary source file, so a
+        # file's signature covers its content and the cards it is primary for
+        primary: Dict[str, set] = {}
+        for product_type in set(FILE_PRODUCT_TYPES.values()):
+            for record in self.catalog.iter_records(product_type):
+                primary.setdefault(record.sources[0], set()).add(
+                    (product_type, f"{record.bank}|{card_key(record.name)}")
+                )
+
+        signatures = {
+            file_name: (self.catalog.get_file_hash(file_name) or "", frozenset(keys))
+            for file_name, keys in primary.items()
+        }
+
+        removed = [name for name in self._files if name not in signatures]
+        changed = [name for name, sig in signatures.items()
+                   if name not in self._files or self._files[name][0] != sig]
+
+        for file_name in removed + changed:
+            _, entries = self._files.pop(file_name, (None, []))
+            for product_type, field, card in entries:
+                self._columns[(product_type, field)].remove(card)
+
+        for file_name in changed:
+            entries = self._index_file(file_name, signatures[file_name][1])
+            for product_type, field, card in entries:
+                self._columns.setdefault((product_type, field), SortedColumn()).add(card)
+            self._files[file_name] = (signatures[file_name], entries)
+
+        if removed or changed:
+            logger.info(
+                f"Ranking index updated: {len(changed)} files re-indexed, {len(removed)} removed "
+                f"(catalog {self.catalog.version})"
+            )
+        return bool(removed or changed)
+
+    def _index_file(self, file_name: str, keys: FrozenSet[Tuple[str, str]]) -> List[Tuple[str, str, RankedCard]]:
+        entries = []
+        for product_type in sorted({pt for pt, _ in keys}):
+            parameters = get_ranked_parameters(product_type)
+            file_entries = self.cache.get_file_entries(file_name, product_type)
+            for pt, key in sorted(keys):
+                entry = file_entries.get(key) if pt == product_type else None
+                if entry is None:
+                    continue
+                normalized = entry["normalized"]
+                for field, rule in parameters.items():
+                    value = entry["numeric"].get(field)
+                    if value is None:
+                        continue
+                    entries.append((product_type, field, RankedCard(
+                        value=float(value),
+                        bank=key.split("|", 1)[0],
+                        card=normalized.get("product_name", ""),
+                        display=str(normalized.get(rule.display_field, "Н/Д")),
+                        source=file_name,
+                    )))
+        return entries
+
+
+@lru_cache
+def get_ranking_index() -> RankingIndex:
+    """Get the process-wide ranking index"""
+    return RankingIndex()
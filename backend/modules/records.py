@@ -0,0 +1,183 @@
+"""
+modules/records.py - Compact typed records for normalized products
+
+One slotted dataclass per product type replaces free-form dicts when the
+whole market is kept in memory. Every record holds the display strings
+produced by DataNormalizer plus typed numeric fields for comparisons.
+"""
+
+import sys
+from dataclasses import dataclass
+from typing import Any, ClassVar, Dict, Optional, Tuple
+
+from modules.value_parser import NA, parse_value
+
+
+def _intern(value: Any) -> Any:
+    """Share identical display strings between records"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def numeric_bound(value: Any, bound: str) -> Optional[float]:
+    """
+    Extract a number from a display string like "9.8%-49.8%".
+
+    bound is one of:
+        "min", "max": smallest / largest number of any unit
+        "percent_min", "percent_max": only numbers written as percents
+            ("7% годовых до 100 000 ₽" -> 7); a bare "25" counts as a percent
+        "annual_min": smallest amount per year ("2 990 ₽/мес" -> 35880)
+    """
+    parsed = parse_value(value)
+    if bound == "percent_min" or bound == "percent_max":
+        if parsed.unit != "percent":
+            return (parsed.min if bound == "percent_min" else parsed.max) if parsed.bare else None
+        return parsed.percent_min if bound == "percent_min" else parsed.percent_max
+    if bound == "annual_min":
+        per_year = parsed.per_year
+        return parsed.min * per_year if per_year and parsed.min is not None else parsed.min
+    return parsed.min if bound == "min" else parsed.max
+
+
+@dataclass(slots=True)
+class NormalizedProduct:
+    """Base record: bank and product name are common to all product types"""
+
+    DISPLAY_FIELDS: ClassVar[Tuple[str, ...]] = ("bank", "product_name")
+    # numeric field -> (display field, "min" | "max")
+    NUMERIC_FIELDS: ClassVar[Dict[str, Tuple[str, str]]] = {}
+    PRODUCT_TYPE: ClassVar[str] = ""
+
+    bank: str
+    product_name: str = NA
+
+    @classmethod
+    def from_normalized(cls, normalized: Dict[str, Any]) -> "NormalizedProduct":
+        """Build record from a DataNormalizer dict"""
+        record = cls(**{name: _intern(normalized.get(name, NA)) for name in cls.DISPLAY_FIELDS})
+        for numeric_name, (source, bound) in cls.NUMERIC_FIELDS.items():
+            setattr(record, numeric_name, numeric_bound(getattr(record, source), bound))
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Display fields in the same shape as DataNormalizer dicts"""
+        return {name: getattr(self, name) for name in self.DISPLAY_FIELDS}
+
+    def numeric(self) -> Dict[str, Optional[float]]:
+        """Typed numeric fields"""
+        return {name: getattr(self, name) for name in self.NUMERIC_FIELDS}
+
+
+@dataclass(slots=True)
+class CreditCardRecord(NormalizedProduct):
+    DISPLAY_FIELDS: ClassVar[Tuple[str, ...]] = (
+        "bank", "product_name", "interest_rate", "grace_period", "cashback", "annual_fee",
+        "max_limit", "min_payment", "min_salary_requirement", "commission",
+    )
+    NUMERIC_FIELDS: ClassVar[Dict[str, Tuple[str, str]]] = {
+        "interest_rate_min": ("interest_rate", "percent_min"),
+        "interest_rate_max": ("interest_rate", "percent_max"),
+        "grace_period_days": ("grace_period", "max"),
+        "annual_fee_value": ("annual_fee", "annual_min"),
+        "max_limit_value": ("max_limit", "max"),
+        "cashback_percent": ("cashback", "percent_max"),
+    }
+    PRODUCT_TYPE: ClassVar[str] = "credit_card"
+
+    interest_rate: str = NA
+    grace_period: str = NA
+    cashback: str = NA
+    annual_fee: str = NA
+    max_limit: str = NA
+    min_payment: str = NA
+    min_salary_requirement: str = NA
+    commission: str = NA
+    interest_rate_min: Optional[float] = None
+    interest_rate_max: Optional[float] = None
+    grace_period_days: Optional[float] = None
+    annual_fee_value: Optional[float] = None
+    max_limit_value: Optional[float] = None
+    cashback_percent: Optional[float] = None
+
+
+@dataclass(slots=True)
+class DebitCardRecord(NormalizedProduct):
+    DISPLAY_FIELDS: ClassVar[Tuple[str, ...]] = (
+        "bank", "product_name", "annual_fee", "interest_on_balance", "cashback", "loyalty_program",
+        "sms_notifications", "withdrawals", "transfers", "monthly_limit",
+    )
+    NUMERIC_FIELDS: ClassVar[Dict[str, Tuple[str, str]]] = {
+        "annual_fee_value": ("annual_fee", "annual_min"),
+        "interest_on_balance_value": ("interest_on_balance", "percent_max"),
+        "cashback_percent": ("cashback", "percent_max"),
+    }
+    PRODUCT_TYPE: ClassVar[str] = "debit_card"
+
+    annual_fee: str = NA
+    interest_on_balance: str = NA
+    cashback: str = NA
+    loyalty_program: str = NA
+    sms_notifications: str = NA
+    withdrawals: str = NA
+    transfers: str = NA
+    monthly_limit: str = NA
+    annual_fee_value: Optional[float] = None
+    interest_on_balance_value: Optional[float] = None
+    cashback_percent: Optional[float] = None
+
+
+@dataclass(slots=True)
+class DepositRecord(NormalizedProduct):
+    DISPLAY_FIELDS: ClassVar[Tuple[str, ...]] = (
+        "bank", "product_name", "interest_rate", "term_months", "min_amount", "max_amount",
+        "replenishment", "early_withdrawal", "insurance",
+    )
+    NUMERIC_FIELDS: ClassVar[Dict[str, Tuple[str, str]]] = {
+        "interest_rate_min": ("interest_rate", "percent_min"),
+        "interest_rate_max": ("interest_rate", "percent_max"),
+        "min_amount_value": ("min_amount", "min"),
+        "max_amount_value": ("max_amount", "max"),
+    }
+    PRODUCT_TYPE: ClassVar[str] = "deposit"
+
+    interest_rate: str = NA
+    term_months: str = NA
+    min_amount: str = NA
+    max_amount: str = NA
+    replenishment: str = NA
+    early_withdrawal: str = NA
+    insurance: str = NA
+    interest_rate_min: Optional[float] = None
+    interest_rate_max: Optional[float] = None
+    min_amount_value: Optional[float] = None
+    max_amount_value: Optional[float] = None
+
+
+@dataclass(slots=True)
+class ConsumerLoanRecord(NormalizedProduct):
+    DISPLAY_FIELDS: ClassVar[Tuple[str, ...]] = (
+        "bank", "product_name", "interest_rate", "max_amount", "term_months", "commission",
+        "approval_time", "min_score",
+    )
+    NUMERIC_FIELDS: ClassVar[Dict[str, Tuple[str, str]]] = {
+        "interest_rate_min": ("interest_rate", "percent_min"),
+        "interest_rate_max": ("interest_rate", "percent_max"),
+        "max_amount_value": ("max_amount", "max"),
+    }
+    PRODUCT_TYPE: ClassVar[str] = "consumer_loan"
+
+    interest_rate: str = NA
+    max_amount: str = NA
+    term_months: str = NA
+    commission: str = NA
+    approval_time: str = NA
+    min_score: str = NA
+    interest_rate_min: Optional[float] = None
+    interest_rate_max: Optional[float] = None
+    max_amount_value: Optional[float] = None
+
+
+RECORD_TYPES = {
+    record_type.PRODUCT_TYPE: record_type
+    for record_type in (CreditCardRecord, DebitCardRecord, DepositRecord, ConsumerLoanRecord)
+}
@@ -5,7 +5,6 @@ modules/report_generator.py - Generate XLSX, PDF and JSON reports with chart sup
 import logging
 from typing import Dict, Any, Optional, List  # Add List here
 from datetime import datetime
-import pandas as pd
 from openpyxl import Workbook
 from openpyxl.cell import MergedCell
 from openpyxl.utils import get_column_letter
@@ -16,6 +15,8 @@ import tempfile
 import os
 import json
 
+from modules.comparison_table import as_dataframe
+
 logger = logging.getLogger(__name__)
 
 class ReportGenerator:
@@ -114,7 +115,7 @@ class ReportGenerator:
         ws.merge_cells('A2:D2')
         
         # Add comparison table
-        comparison_df = comparison_data.get("comparison_table")
+        comparison_df = as_dataframe(comparison_data.get("comparison_table"))
         if comparison_df is not None:
             for r_idx, row in enumerate(comparison_df.values, start=4):
                 for c_idx, value in enumerate(row, start=1):
@@ -247,7 +248,7 @@ class ReportGenerator:
             elements.append(Spacer(1, 0.2*inch))
         
         # Comparison table
-        comparison_df = comparison_data.get("comparison_table")
+        comparison_df = as_dataframe(comparison_data.get("comparison_table"))
         if comparison_df is not None:
             heading = Paragraph("📋 Сравнительная таблица", heading_style)
             elements.append(heading)
@@ -578,7 +579,7 @@ class ReportGenerator:
             elements.append(Spacer(1, 0.2*inch))
 
         # Table
-        df = comparison_data.get("comparison_table")
+        df = as_dataframe(comparison_data.get("comparison_table"))
         if df is not None:
             elements.append(Paragraph("📋 Сравнительная таблица", heading_style))
             elements.append(Spacer(1, 0.1*inch))
@@ -673,7 +674,7 @@ class ReportGenerator:
         ws.merge_cells('A2:E2')
 
         # Comparison Table
-        comparison_df = comparison_data.get("comparison_table")
+        comparison_df = as_dataframe(comparison_data.get("comparison_table"))
         if comparison_df is not None:
             # Headers
             headers = comparison_df.columns
@@ -0,0 +1,247 @@
+"""
+modules/rule_engine.py - Deterministic rule-based comparison of N banks
+
+Products are turned into a numeric matrix (banks × parameters). Each
+parameter has a direction (lower or higher is better), so the best bank,
+ranks and deltas for all banks are computed in one NumPy pass.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from modules.catalog import ProductCatalog
+from modules.normalizer import DataNormalizer
+from modules.records import NormalizedProduct
+
+logger = logging.getLogger(__name__)
+
+LOWER_IS_BETTER = -1
+HIGHER_IS_BETTER = 1
+
+
+@dataclass(frozen=True)
+class ParameterRule:
+    """Numeric record field compared between banks"""
+    field: str          # numeric field of the normalized record
+    display_field: str  # display field shown in tables
+    label: str
+    direction: int
+
+
+PRODUCT_RULES: Dict[str, List[ParameterRule]] = {
+    "credit_card": [
+        ParameterRule("interest_rate_min", "interest_rate", "Процентная ставка", LOWER_IS_BETTER),
+        ParameterRule("grace_period_days", "grace_period", "Льготный период", HIGHER_IS_BETTER),
+        ParameterRule("annual_fee_value", "annual_fee", "Годовое обслуживание", LOWER_IS_BETTER),
+        ParameterRule("max_limit_value", "max_limit", "Макс. лимит", HIGHER_IS_BETTER),
+    ],
+    "debit_card": [
+        ParameterRule("annual_fee_value", "annual_fee", "Годовое обслуживание", LOWER_IS_BETTER),
+        ParameterRule("interest_on_balance_value", "interest_on_balance", "Процент на остаток", HIGHER_IS_BETTER),
+    ],
+    "deposit": [
+        ParameterRule("interest_rate_max", "interest_rate", "Процентная ставка", HIGHER_IS_BETTER),
+        ParameterRule("min_amount_value", "min_amount", "Мин. сумма", LOWER_IS_BETTER),
+        ParameterRule("max_amount_value", "max_amount", "Макс. сумма", HIGHER_IS_BETTER),
+    ],
+    "consumer_loan": [
+        ParameterRule("interest_rate_min", "interest_rate", "Процентная ставка", LOWER_IS_BETTER),
+        ParameterRule("max_amount_value", "max_amount", "Макс. сумма", HIGHER_IS_BETTER),
+    ],
+}
+
+
+def rank_matrix(values: np.ndarray, directions: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Rank banks for every parameter of a (banks × parameters) matrix.
+
+    Args:
+        values: float matrix, NaN for missing values
+        directions: +1 (higher is better) or -1 (lower is better) per parameter
+
+    Returns:
+        Dict with
+            ranks: 1 = best, NaN where the value is missing (ties share a rank)
+            best: index of the best bank per parameter, -1 if nobody has a value
+            deltas: advantage of each bank over the best one, in the parameter's
+                own units (0 for the best bank, negative is worse)
+            reference_deltas: advantage over the first (reference) bank
+            scores: share of compared parameters where the bank is best
+    """
+    oriented = values * directions
+    present = ~np.isnan(oriented)
+    filled = np.where(present, oriented, -np.inf)
+
+    best_oriented = filled.max(axis=0, initial=-np.inf)
+    has_value = present.any(axis=0)
+    best = np.where(has_value, filled.argmax(axis=0), -1) if len(values) else np.full(values.shape[1], -1)
+
+    # Rank = 1 + number of banks with a strictly better value
+    better = (filled[None, :, :] > filled[:, None, :]).sum(axis=1)
+    ranks = np.where(present, better + 1, np.nan)
+
+    deltas = np.where(present, oriented - best_oriented, np.nan)
+    reference_deltas = oriented - oriented[:1]
+
+    is_best = present & (filled == best_oriented)
+    compared = has_value.sum()
+    scores = is_best[:, has_value].sum(axis=1) / compared if compared else np.zeros(len(values))
+
+    return {
+        "ranks": ranks,
+        "best": best,
+        "deltas": deltas,
+        "reference_deltas": reference_deltas,
+        "scores": scores,
+    }
+
+
+def pairwise_advantage(values: np.ndarray, directions: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    All-vs-all comparison of a (banks × parameters) matrix.
+
+    Returns:
+        Dict with
+            advantage: (parameters × banks × banks) array, advantage[p, i, j] is how
+                much bank i is better than bank j on parameter p (NaN if either is missing)
+            wins: (banks × banks) number of parameters where bank i is strictly better than j
+    """
+    oriented = (values * directions).T                  # parameters × banks
+    advantage = oriented[:, :, None] - oriented[:, None, :]
+    wins = (np.nan_to_num(advantage, nan=0.0) > 0).sum(axis=0)
+    return {"advantage": advantage, "wins": wins}
+
+
+class RuleEngine:
+    """Compare normalized products of N banks without an LLM"""
+
+    def __init__(self, normalizer: Optional[DataNormalizer] = None):
+        self.normalizer = normalizer or DataNormalizer()
+
+    def compare(
+        self,
+        banks: Sequence[str],
+        products: Sequence[Dict[str, Any]],
+        product_type: str
+    ) -> Dict[str, Any]:
+        """
+        Compare raw products (single cards or product files) of several banks.
+
+        Args:
+            banks: Bank names; the first bank is the reference
+            products: Raw product data in the same order as banks
+            product_type: Type of product (credit_card, debit_card, deposit, consumer_loan)
+
+        Returns:
+            Dict with banks, rules, records, matrix and rank_matrix results
+
+        Raises:
+            ValueError: if there are no comparison rules for the product type
+        """
+        if product_type not in PRODUCT_RULES:
+            raise ValueError(f"Unsupported product type for comparison: {product_type}")
+        records = [
+            self.normalizer.normalize_record(primary_card(data), bank, product_type)
+            for bank, data in zip(banks, products)
+        ]
+        return self.compare_records(banks, records, PRODUCT_RULES[product_type])
+
+    def compare_records(
+        self,
+        banks: Sequence[str],
+        records: Sequence[NormalizedProduct],
+        rules: Sequence[ParameterRule]
+    ) -> Dict[str, Any]:
+        """Compare already normalized records"""
+        matrix = np.array(
+            [[_to_float(getattr(record, rule.field, None)) for rule in rules] for record in records],
+            dtype=float
+        ).reshape(len(records), len(rules))
+        directions = np.array([rule.direction for rule in rules], dtype=float)
+
+        result = rank_matrix(matrix, directions)
+        result.update({
+            "banks": list(banks),
+            "rules": list(rules),
+            "records": list(records),
+            "matrix": matrix,
+        })
+        return result
+
+
+def primary_card(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Card to compare: the data itself or the first card of a product file"""
+    cards = data.get("карты") if isinstance(data, dict) else None
+    if isinstance(cards, list) and cards and isinstance(cards[0], dict):
+        return cards[0]
+    return data if isinstance(data, dict) else {}
+
+
+def _to_float(value: Optional[float]) -> float:
+    return float(value) if value is not None else np.nan
+
+
+# (catalog version, product type) -> market matrix
+_market_matrix_cache: Dict[Tuple[str, str], Dict[str, Any]] = {}
+_market_matrix_lock = threading.Lock()
+
+
+def build_market_matrix(product_type: str, catalog: Optional[ProductCatalog] = None) -> Dict[str, Any]:
+    """
+    Compare every bank with every bank for a product type.
+
+    A bank's value for a parameter is the best value among its cards.
+    Results are cached per catalog version.
+
+    Returns:
+        Dict with banks, rules, values (banks × parameters), advantage
+        (parameters × banks × banks) and wins (banks × banks)
+    """
+    # Imported here: the normalization cache itself depends on the catalog and normalizer
+    from modules.normalization_cache import NormalizationCache, get_normalization_cache
+
+    cache = get_normalization_cache()
+    if catalog is not None and catalog is not cache.catalog:
+        cache = NormalizationCache(catalog=catalog)
+    catalog = cache.catalog
+    key = (catalog.version, product_type)
+    with _market_matrix_lock:
+        cached = _market_matrix_cache.get(key)
+    if cached is not None:
+        return cached
+
+    rules = PRODUCT_RULES[product_type]
+    directions = np.array([rule.direction for rule in rules], dtype=float)
+    records = cache.get_records(product_type)
+
+    banks = sorted({record.bank for record in records})
+    bank_rows = {bank: idx for idx, bank in enumerate(banks)}
+    card_values = np.array(
+        [[_to_float(getattr(record, rule.field, None)) for rule in rules] for record in records],
+        dtype=float
+    ).reshape(len(records), len(rules))
+
+    # Best card per bank: fmax ignores NaN unless the bank has no value at all
+    oriented = card_values * directions
+    values = np.full((len(banks), len(rules)), np.nan)
+    for row, record in zip(oriented, records):
+        idx = bank_rows[record.bank]
+        values[idx] = np.fmax(values[idx], row)
+    values = values * directions
+
+    result = {
+        "product_type": product_type,
+        "banks": banks,
+        "rules": list(rules),
+        "values": values,
+        **pairwise_advantage(values, directions),
+    }
+    with _market_matrix_lock:
+        if len(_market_matrix_cache) >= 16:
+            _market_matrix_cache.clear()
+        _market_matrix_cache[key] = result
+    return result
@@ -2,51 +2,74 @@
 modules/scraper.py - Data reader module for collecting current product data from local files
 """
 
-import json
 import logging
-from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, Optional
+
+from modules.bank_aliases import get_bank_index
+from modules.catalog import get_catalog, card_key
+from modules.json_stream import iter_array_items
+from modules.product_store import get_product_store
 
 logger = logging.getLogger(__name__)
 
 class BankDataReader:
     """Read product data from local JSON files"""
 
-    def __init__(self):
-        self.base_path = Path(__file__).parent.parent / "configs" / "bank_data"
-        self.file_mapping = {
-            "credit_card": {
-                "ВТБ": "4_vtb_credit.json",
-                "Сбер": "6_sberbank_credit.json",
-                "Альфа": "8_alfabank_credit.json",
-                "Тинькофф": "10_tbank_credit.json",
-            },
-            "debit_card": {
-                "ВТБ": "3_vtb_debit.json",
-                "Сбер": "5_sberbank_debit.json",
-                "Альфа": "7_alfabank_debit.json",
-                "Тинькофф": "9_tbank_debit.json",
-            }
-        }
+    def __init__(self, store=None):
+        self.catalog = get_catalog()
+        self.store = store or get_product_store()
+        self.base_path = self.catalog.data_dir
+        self.bank_index = get_bank_index()
 
     def get_product_data(self, bank: str, product_type: str) -> Dict[str, Any]:
         """Load product data for a specific bank and product type"""
-        file_name = self.file_mapping.get(product_type, {}).get(bank)
-        if not file_name:
-            logger.warning(f"No data file configured for {bank} and {product_type}")
+        bank_id = self.bank_index.resolve(bank)
+        if not bank_id:
+            logger.warning(f"Unknown bank: {bank}")
             return self._get_fallback_data(bank, product_type)
 
-        file_path = self.base_path / file_name
-        if not file_path.exists():
-            logger.error(f"Data file not found: {file_path}")
+        data = self.store.get_product(bank_id, product_type)
+        if data is None:
+            logger.warning(f"No data file configured for {bank} and {product_type}")
             return self._get_fallback_data(bank, product_type)
 
+        return data
+
+    def iter_cards(
+        self,
+        bank: str,
+        product_type: str,
+        card_name: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream cards of a bank product file one at a time.
+
+        Args:
+            bank: Bank name in any known spelling
+            product_type: Product type (credit_card, debit_card)
+            card_name: If set, only cards with this name are yielded
+
+        Yields:
+            Card dicts from the "карты" array
+        """
+        bank_id = self.bank_index.resolve(bank)
+        file_path = self.catalog.get_product_path(bank_id, product_type) if bank_id else None
+        if file_path is None:
+            logger.warning(f"No data file configured for {bank} and {product_type}")
+            return
+
+        wanted = card_key(card_name) if card_name is not None else None
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Error reading data file {file_path}: {e}")
-            return self._get_fallback_data(bank, product_type)
+                for card in iter_array_items(f, "карты"):
+                    if wanted is None or card_key(card.get("название", card.get("карта"))) == wanted:
+                        yield card
+        except (OSError, ValueError) as e:
+            logger.error(f"Error streaming data file {file_path}: {e}")
+
+    def get_card(self, bank: str, product_type: str, card_name: str) -> Optional[Dict[str, Any]]:
+        """Read a single card, stopping as soon as it is found"""
+        return next(self.iter_cards(bank, product_type, card_name), None)
 
     def scrape_credit_card(self, bank: str, product_type: str = "credit_card") -> Dict[str, Any]:
         """Get credit card data for a specific bank"""
@@ -4,12 +4,18 @@ modules/utils.py - Utility functions for data processing
 
 import json
 import logging
+import os
+import re
+import threading
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, Optional
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+_NUMBER_PATTERN = re.compile(r'[\d,\.]+')
+
 def load_json_config(filepath: str) -> Dict[str, Any]:
     """Load JSON configuration file"""
     try:
@@ -23,13 +29,31 @@ def load_json_config(filepath: str) -> Dict[str, Any]:
         return {}
 
 def save_json_cache(data: Dict[str, Any], filename: str, cache_dir: str = "./cache"):
-    """Save data to JSON cache file"""
-    Path(cache_dir).mkdir(exist_ok=True)
+    """Save data to JSON cache file (atomically, readers never see a partial file)"""
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
     filepath = Path(cache_dir) / filename
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    tmp_path = filepath.with_name(f"{filepath.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, filepath)
+    finally:
+        tmp_path.unlink(missing_ok=True)
     logger.info(f"Cache saved: {filepath}")
 
+def load_json_cache(filename: str, cache_dir: str = "./cache") -> Optional[Dict[str, Any]]:
+    """Load data from JSON cache file, None if missing or unreadable"""
+    filepath = Path(cache_dir) / filename
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (json.JSONDecodeError, OSError) as e:
+        logger.warning(f"Ignoring broken cache file {filepath}: {e}")
+        return None
+
+@lru_cache(maxsize=4096, typed=True)
 def normalize_rate(rate_str: str) -> Optional[float]:
     """Convert rate string to float (handles % symbol)"""
     if not rate_str:
@@ -46,10 +70,10 @@ def normalize_currency(value: str, currency: str = "RUB") -> Dict[str, Any]:
         "currency": currency
     }
 
+@lru_cache(maxsize=4096, typed=True)
 def extract_number(text: str) -> Optional[float]:
     """Extract first number from text"""
-    import re
-    match = re.search(r'[\d,\.]+', str(text))
+    match = _NUMBER_PATTERN.search(str(text))
     if match:
         return float(match.group().replace(',', '.'))
     return None
@@ -70,3 +94,18 @@ def merge_data_safely(base: Dict, update: Dict) -> Dict:
         if value is not None:
             result[key] = value
     return result
+
+
+# Memoized helpers: called with strings only, results are cached per text
+_MEMOIZED = (normalize_rate, extract_number)
+
+
+def get_memo_stats() -> Dict[str, Dict[str, int]]:
+    """Hit/miss counters of all memoized functions"""
+    return {func.__qualname__: func.cache_info()._asdict() for func in _MEMOIZED}
+
+
+def clear_memo_caches():
+    """Drop all memoized results, e.g. after formatting rules change"""
+    for func in _MEMOIZED:
+        func.cache_clear()
@@ -5,20 +5,117 @@ Provides validation for bank data against expected schemas,
 ensuring data quality and completeness.
 """
 
+import hashlib
+import json
 import logging
-from typing import Dict, Any, List, Optional, Tuple
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Any, FrozenSet, List, Optional, Tuple, Union
 from datetime import datetime
 from pathlib import Path
 
+import numpy as np
+
 from configs.schemas import get_schema
 from configs.field_mappings import (
     get_mapping_for_product,
     get_all_possible_field_names,
     NESTED_FIELD_HANDLERS
 )
+from modules.catalog import DEFAULT_DATA_DIR, KIND_COMPARISON, MANIFEST_NAME, classify_file
+from modules.utils import load_json_cache, save_json_cache
+from modules.value_parser import parse_value
 
 logger = logging.getLogger(__name__)
 
+EMPTY_VALUES = frozenset({"Н/Д", "N/A", "", "None"})
+
+# Bump when validation rules change, so cached verdicts are recomputed
+VALIDATOR_VERSION = 2
+DEFAULT_VALIDATION_CACHE_DIR = os.getenv(
+    "BANK_DATA_VALIDATION_CACHE_DIR",
+    str(Path(__file__).parent.parent / "cache")
+)
+VALIDATION_CACHE_FILE = "validation_cache.json"
+
+
+@dataclass(frozen=True, slots=True)
+class FieldCheck:
+    """Precomputed lookup data for one required field"""
+
+    field: str
+    # Any of these source names marks the field as present
+    names: FrozenSet[str]
+    # Names tried in order when reading the value
+    value_names: Tuple[str, ...]
+    # An alias is a nested structure handler, the field always counts as present
+    always_present: bool
+    expected: str
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledValidator:
+    """Required field checks of one product type, compiled from its schema"""
+
+    product_type: str
+    checks: Tuple[FieldCheck, ...]
+    # source name -> indexes of checks it satisfies
+    name_index: Dict[str, Tuple[int, ...]]
+
+    def present_fields(self, data: Dict[str, Any]) -> List[bool]:
+        """One pass over data keys, marking which required fields are present"""
+        present = [check.always_present for check in self.checks]
+        name_index = self.name_index
+        for key in data:
+            for idx in name_index.get(key, ()):
+                present[idx] = True
+        return present
+
+    def field_value(self, data: Dict[str, Any], check: FieldCheck) -> Any:
+        for name in check.value_names:
+            if name in data:
+                return data[name]
+        return None
+
+
+@lru_cache(maxsize=32)
+def get_compiled_validator(product_type: str) -> Optional[CompiledValidator]:
+    """Compile schema, aliases and product mapping into a cached validator"""
+    schema = get_schema(product_type)
+    if not schema:
+        return None
+
+    mapping = get_mapping_for_product(product_type)
+    checks = []
+    for field in schema.get("fields", []):
+        if field == "bank":  # Bank is added during normalization
+            continue
+        # Sorted: the names end up in issue texts cached across runs
+        possible_names = sorted(get_all_possible_field_names(field))
+        names = frozenset(possible_names).union(
+            source for source, target in mapping.items() if target == field
+        )
+        checks.append(FieldCheck(
+            field=field,
+            names=names,
+            value_names=tuple(possible_names),
+            always_present=not names.isdisjoint(NESTED_FIELD_HANDLERS),
+            expected=', '.join(possible_names[:3]),
+        ))
+
+    name_index: Dict[str, List[int]] = {}
+    for idx, check in enumerate(checks):
+        for name in check.names:
+            name_index.setdefault(name, []).append(idx)
+
+    return CompiledValidator(
+        product_type=product_type,
+        checks=tuple(checks),
+        name_index={name: tuple(idxs) for name, idxs in name_index.items()},
+    )
+
 
 class DataValidator:
     """Validate bank product data against schemas"""
@@ -39,28 +136,18 @@ class DataValidator:
             Tuple[bool, List[str]]: (is_valid, list_of_issues)
         """
         issues = []
-        schema = get_schema(product_type)
+        validator = get_compiled_validator(product_type)
         
-        if not schema:
+        if not validator:
             issues.append(f"⚠️ Unknown product type: {product_type}")
             return False, issues
         
-        # Check for required fields
-        required_fields = schema.get("fields", [])
-        mapping = get_mapping_for_product(product_type)
-        
-        for field in required_fields:
-            if field == "bank":  # Bank is added during normalization
-                continue
-                
-            # Check if field exists in data (considering aliases)
-            field_found = self._check_field_exists(data, field, mapping)
-            
+        # Check for required fields (considering aliases)
+        for check, field_found in zip(validator.checks, validator.present_fields(data)):
             if not field_found:
-                possible_names = get_all_possible_field_names(field)
                 issues.append(
-                    f"❌ Missing required field '{field}' for {bank}. "
-                    f"Expected one of: {', '.join(possible_names[:3])}"
+                    f"❌ Missing required field '{check.field}' for {bank}. "
+                    f"Expected one of: {check.expected}"
                 )
         
         # Check data types and formats
@@ -133,63 +220,77 @@ class DataValidator:
         Returns:
             float: Percentage of required fields present with valid data
         """
-        schema = get_schema(product_type)
-        required_fields = [f for f in schema.get("fields", []) if f != "bank"]
-        mapping = get_mapping_for_product(product_type)
+        validator = get_compiled_validator(product_type)
         
-        if not required_fields:
+        if not validator or not validator.checks:
             return 1.0
         
         fields_present = 0
-        for field in required_fields:
-            if self._check_field_exists(data, field, mapping):
-                value = self._get_field_value(data, field, mapping)
-                # Check if value is meaningful (not N/A, Н/Д, etc.)
-                if value and value not in ["Н/Д", "N/A", "Н/Д", "", "None"]:
+        for check, field_found in zip(validator.checks, validator.present_fields(data)):
+            if field_found:
+                if self._has_value(validator.field_value(data, check)):
                     fields_present += 1
         
-        return fields_present / len(required_fields)
+        return fields_present / len(validator.checks)
 
-    def _check_field_exists(
-        self, 
-        data: Dict[str, Any], 
-        normalized_field: str,
-        mapping: Dict[str, str]
-    ) -> bool:
-        """Check if a normalized field exists in data (checking all possible names)"""
-        # Get all possible source field names
-        possible_names = get_all_possible_field_names(normalized_field)
-        
-        # Also check the mapping
-        for source, target in mapping.items():
-            if target == normalized_field:
-                possible_names.append(source)
-        
-        # Check if any of these names exist in data
-        for name in possible_names:
-            if name in data:
-                return True
-            
-            # Check nested structures
-            if name in NESTED_FIELD_HANDLERS:
-                return True
-        
-        return False
-
-    def _get_field_value(
+    def get_completeness_matrix(
         self,
-        data: Dict[str, Any],
-        normalized_field: str,
-        mapping: Dict[str, str]
-    ) -> Any:
-        """Get field value from data using various possible field names"""
-        possible_names = get_all_possible_field_names(normalized_field)
-        
-        for name in possible_names:
-            if name in data:
-                return data[name]
+        all_data: Dict[str, Union[Dict[str, Any], List[Dict[str, Any]]]],
+        product_type: str
+    ) -> Dict[str, Any]:
+        """
+        Calculate completeness for many banks at once.
         
-        return None
+        Args:
+            all_data: Dict[bank_name, bank_data or list of cards];
+                a bank with several cards has a field if any card has it
+            product_type: Type of product
+        
+        Returns:
+            Dict with banks, fields, boolean presence matrix (banks × fields)
+            and completeness by bank, by field and overall (0.0 to 1.0)
+        """
+        validator = get_compiled_validator(product_type)
+        checks = validator.checks if validator else ()
+        fields = [check.field for check in checks]
+        banks = list(all_data)
+        
+        rows = []
+        row_banks = []
+        for bank_idx, bank in enumerate(banks):
+            entries = all_data[bank]
+            for data in (entries if isinstance(entries, list) else [entries]):
+                rows.append([
+                    field_found and self._has_value(validator.field_value(data, check))
+                    for check, field_found in zip(checks, validator.present_fields(data))
+                ])
+                row_banks.append(bank_idx)
+        
+        presence = np.zeros((len(banks), len(fields)), dtype=bool)
+        if rows and fields:
+            # Merge card rows into their bank rows
+            np.logical_or.at(presence, np.asarray(row_banks), np.asarray(rows, dtype=bool))
+        
+        if not fields:
+            by_bank = np.ones(len(banks))
+            by_field = np.ones(0)
+        else:
+            by_bank = presence.mean(axis=1)
+            by_field = presence.mean(axis=0) if banks else np.zeros(len(fields))
+        
+        return {
+            "product_type": product_type,
+            "banks": banks,
+            "fields": fields,
+            "presence": presence,
+            "by_bank": dict(zip(banks, by_bank.tolist())),
+            "by_field": dict(zip(fields, by_field.tolist())),
+            "overall": float(presence.mean()) if presence.size else (1.0 if banks else 0.0),
+        }
+
+    def _has_value(self, value: Any) -> bool:
+        """Check if value is meaningful (not N/A, Н/Д, etc.)"""
+        return bool(value) and not (isinstance(value, str) and value in EMPTY_VALUES)
 
     def _validate_field_formats(self, data: Dict[str, Any], product_type: str) -> List[str]:
         """Validate that fields have expected formats"""
@@ -217,20 +318,8 @@ class DataValidator:
         if not isinstance(rate_str, str):
             return False
         
-        # Remove common characters
-        cleaned = rate_str.replace('%', '').replace(' ', '').replace('₽', '')
-        
-        # Check for range format (e.g., "9.8-49.8")
-        if '-' in cleaned:
-            parts = cleaned.split('-')
-            return all(self._is_number(p) for p in parts)
-        
-        # Check for "до X%" format
-        if cleaned.startswith('до'):
-            num_part = cleaned.replace('до', '').strip()
-            return self._is_number(num_part)
-        
-        return self._is_number(cleaned)
+        # Plain number, range (e.g., "9.8%-49.8%") or "до X%" format
+        return parse_value(rate_str).bare
 
     def _is_valid_amount_string(self, amount_str: str) -> bool:
         """Check if string represents a valid amount"""
@@ -313,18 +402,156 @@ class DataValidator:
                 })
                 all_issues.extend(issues)
         
-        # Find common issues
-        issue_counts = {}
-        for issue in all_issues:
-            # Extract issue type (remove bank-specific details)
-            issue_type = issue.split(":")[-1].strip()
-            issue_counts[issue_type] = issue_counts.get(issue_type, 0) + 1
-        
-        # Get top 5 most common issues
-        sorted_issues = sorted(issue_counts.items(), key=lambda x: x[1], reverse=True)
-        report["common_issues"] = [
-            {"issue": issue, "count": count} 
-            for issue, count in sorted_issues[:5]
-        ]
+        report["common_issues"] = _common_issues(all_issues)
         
         return report
+
+    def validate_file_data(self, data: Dict[str, Any], kind: str, bank: Optional[str], product_type: str) -> Dict[str, Any]:
+        """
+        Validate one parsed data file.
+        
+        Cards of single-bank files are validated with the file date, so the
+        freshness check applies to the file rather than to every card.
+        
+        Returns:
+            Dict with is_valid, issues and completeness (0.0 to 1.0)
+        """
+        if kind == KIND_COMPARISON:
+            is_valid, issues = self.validate_comparison_data(data, product_type)
+            entries = [entry for entry in data.get("банки", {}).values() if isinstance(entry, dict)]
+        else:
+            issues = []
+            entries = []
+            for card in data.get("карты", []):
+                if not isinstance(card, dict):
+                    continue
+                card_data = {"дата": data.get("дата"), **card}
+                label = f"{bank}/{card.get('название', card.get('карта', '?'))}"
+                _, card_issues = self.validate_product_data(card_data, product_type, label)
+                issues.extend(card_issues)
+                entries.append(card_data)
+            if not entries:
+                issues.append(f"❌ No cards found for {bank}")
+            is_valid = len(issues) == 0
+        
+        scores = [self.get_data_completeness_score(entry, product_type) for entry in entries]
+        return {
+            "is_valid": is_valid,
+            "issues": issues,
+            "completeness": sum(scores) / len(scores) if scores else 0.0,
+        }
+
+
+def _common_issues(all_issues: List[str], limit: int = 5) -> List[Dict[str, Any]]:
+    """Most common issue types across banks or files"""
+    issue_counts = {}
+    for issue in all_issues:
+        # Extract issue type (remove bank-specific details)
+        issue_type = issue.split(":")[-1].strip()
+        issue_counts[issue_type] = issue_counts.get(issue_type, 0) + 1
+    
+    sorted_issues = sorted(issue_counts.items(), key=lambda x: x[1], reverse=True)
+    return [
+        {"issue": issue, "count": count}
+        for issue, count in sorted_issues[:limit]
+    ]
+
+
+def _validation_cache_key(content_hash: str, kind: str, product_type: str) -> str:
+    # The freshness check depends on the current year
+    return f"{content_hash}:{kind}:{product_type}:{VALIDATOR_VERSION}:{datetime.now().year}"
+
+
+def _validate_file_worker(file_path: str, kind: str, bank: Optional[str], product_type: str) -> Dict[str, Any]:
+    """Validate a single file; runs in a worker process"""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except Exception as e:
+        return {"is_valid": False, "issues": [f"❌ Could not read file: {e}"], "completeness": 0.0}
+    if not isinstance(data, dict):
+        return {"is_valid": False, "issues": ["❌ File does not contain a JSON object"], "completeness": 0.0}
+    return DataValidator().validate_file_data(data, kind, bank, product_type)
+
+
+def validate_data_directory(
+    data_dir: Optional[Path] = None,
+    cache_dir: Optional[str] = None,
+    max_workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Validate every data file of the bank data directory (flat or sharded layout).
+    
+    Verdicts are cached by file content hash, so unchanged files are skipped.
+    Changed files are validated in a process pool.
+    
+    Returns:
+        Dict with validation summary and per-file details
+    """
+    data_dir = Path(data_dir) if data_dir else DEFAULT_DATA_DIR
+    cache_dir = cache_dir or DEFAULT_VALIDATION_CACHE_DIR
+    cache = load_json_cache(VALIDATION_CACHE_FILE, cache_dir) or {}
+    
+    verdicts = {}
+    file_keys = {}
+    pending = []
+    for file_path in sorted(data_dir.rglob("*.json")):
+        relative_path = file_path.relative_to(data_dir).as_posix()
+        if relative_path == MANIFEST_NAME:
+            continue
+        info = classify_file(relative_path)
+        if info is None:
+            continue
+        kind, bank, product_type = info
+        key = _validation_cache_key(hashlib.sha256(file_path.read_bytes()).hexdigest(), kind, product_type)
+        file_keys[relative_path] = key
+        if key in cache:
+            verdicts[relative_path] = cache[key]
+        else:
+            pending.append((relative_path, key, (str(file_path), kind, bank, product_type)))
+    
+    cached_files = len(verdicts)
+    if len(pending) > 1 and max_workers != 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [(path, key, pool.submit(_validate_file_worker, *args)) for path, key, args in pending]
+            results = [(path, key, future.result()) for path, key, future in futures]
+    else:
+        results = [(path, key, _validate_file_worker(*args)) for path, key, args in pending]
+    
+    for path, key, verdict in results:
+        verdicts[path] = verdict
+        cache[key] = verdict
+    
+    if pending or len(cache) != len(set(file_keys.values())):
+        # Keep only verdicts of the current files
+        save_json_cache({key: cache[key] for key in file_keys.values()}, VALIDATION_CACHE_FILE, cache_dir)
+    
+    report = {
+        "total_files": len(verdicts),
+        "valid_files": 0,
+        "validated_files": len(pending),
+        "cached_files": cached_files,
+        "files_with_issues": [],
+        "completeness_scores": {},
+        "common_issues": [],
+    }
+    all_issues = []
+    for path, verdict in sorted(verdicts.items()):
+        completeness = f"{verdict['completeness'] * 100:.1f}%"
+        report["completeness_scores"][path] = completeness
+        if verdict["is_valid"]:
+            report["valid_files"] += 1
+        else:
+            report["files_with_issues"].append({
+                "file": path,
+                "issues": verdict["issues"],
+                "completeness": completeness
+            })
+            all_issues.extend(verdict["issues"])
+    
+    report["common_issues"] = _common_issues(all_issues)
+    logger.info(
+        f"Validated {report['total_files']} files: {report['validated_files']} checked, "
+        f"{report['cached_files']} unchanged"
+    )
+    return report
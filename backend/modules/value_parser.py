@@ -0,0 +1,150 @@
+"""
+modules/value_parser.py - Typed parsing of product value strings
+
+Values like "17.9% - 25.9%", "300 000 - 600 000 ₽", "110 дней" or
+"Бесплатно" are parsed once into a ParsedValue, so comparisons and charts
+work with floats instead of re-running regexes on display strings.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Optional, Tuple
+
+NA = "Н/Д"
+_EMPTY_MARKERS = frozenset({"", NA, "нет", "none", "null"})
+_FREE_MARKERS = ("бесплатно", "free")
+
+# "300 000" and "1 000 000,5" are single numbers: digit groups of three
+# separated by a regular or non-breaking space
+_NUMBER = re.compile(r"\d{1,3}(?:[   ]\d{3})+(?:[.,]\d+)?|\d+(?:[.,]\d+)?")
+# Number directly followed by a percent sign, e.g. "7%" in "7% годовых до 100 000 ₽";
+# the optional first group is the lower end of "9.8-49.8%" or "от 9.8 до 49.8%"
+_PERCENT = re.compile(r"(?:(\d+(?:[.,]\d+)?)\s*%?\s*(?:[-–—]|до)\s*)?(\d+(?:[.,]\d+)?)\s*%")
+# Text without any words except "от"/"до" qualifiers, e.g. "до 25%", "9.8%-49.8%"
+_BARE = re.compile(r"^(?:от|до)?[\d\s  .,%₽\-–—]*(?:до[\d\s  .,%₽]*)?$", re.IGNORECASE)
+
+_CURRENCIES = (
+    ("₽", "RUB"), ("руб", "RUB"), ("rub", "RUB"),
+    ("$", "USD"), ("usd", "USD"),
+    ("€", "EUR"), ("eur", "EUR"),
+)
+# Duration units: (marker, unit, days per unit)
+_DURATIONS = (
+    ("дн", "days", 1), ("день", "days", 1), ("day", "days", 1),
+    ("мес", "months", 30), ("month", "months", 30),
+    ("год", "years", 365), ("лет", "years", 365), ("year", "years", 365),
+)
+# Billing periods of money/percent values, e.g. "490 ₽/год", "25% годовых"
+_PERIODS = (
+    ("/год", 365), ("в год", 365), ("годовых", 365), ("/year", 365),
+    ("/мес", 30), ("в месяц", 30), ("/month", 30),
+    ("/день", 1), ("в день", 1),
+)
+# Billing periods per year by period length in days
+_PER_YEAR = {365: 1, 30: 12, 1: 365}
+
+
+@dataclass(frozen=True, slots=True)
+class ParsedValue:
+    """
+    Typed view of a value string.
+
+    unit is "percent", "money", "days", "months", "years" or None.
+    For durations period_days is the duration in days; for money and percent
+    values it is the billing period ("490 ₽/год" -> 365), if one is given.
+    percent_min/percent_max bound only the numbers written as percents, ignoring
+    money amounts mixed into the same text ("7% годовых до 100 000 ₽" -> 7).
+    """
+
+    raw: str
+    min: Optional[float] = None
+    max: Optional[float] = None
+    unit: Optional[str] = None
+    currency: Optional[str] = None
+    period_days: Optional[float] = None
+    is_free: bool = False
+    bare: bool = False
+    percent_min: Optional[float] = None
+    percent_max: Optional[float] = None
+
+    @property
+    def is_numeric(self) -> bool:
+        return self.min is not None
+
+    @property
+    def per_year(self) -> Optional[float]:
+        """How many billing periods fit in a year, None without a billing period"""
+        if self.unit not in ("money", None) or not self.period_days:
+            return None
+        return _PER_YEAR.get(self.period_days, 365 / self.period_days)
+
+
+def _to_float(number: str) -> float:
+    return float(re.sub(r"[   ]", "", number).replace(",", "."))
+
+
+def _detect(text: str, markers: Tuple) -> Optional[Tuple]:
+    for marker in markers:
+        if marker[0] in text:
+            return marker
+    return None
+
+
+@lru_cache(maxsize=8192)
+def _parse_text(raw: str) -> ParsedValue:
+    text = raw.strip().lower()
+    if text in _EMPTY_MARKERS:
+        return ParsedValue(raw=raw)
+
+    numbers = tuple(_to_float(n) for n in _NUMBER.findall(text))
+    percents = [_to_float(n) for pair in _PERCENT.findall(text) for n in pair if n]
+    is_free = any(marker in text for marker in _FREE_MARKERS)
+    if is_free:
+        # "Бесплатно, затем 990 ₽/год" ranges from free to the paid price
+        numbers += (0.0,)
+
+    currency = _detect(text, _CURRENCIES)
+    duration = _detect(text, _DURATIONS)
+    period = _detect(text, _PERIODS)
+    period_days = period[1] if period else None
+
+    if "%" in text:
+        unit = "percent"
+    elif currency:
+        unit = "money"
+    elif duration and numbers:
+        unit = duration[1]
+        period_days = max(numbers) * duration[2]
+    else:
+        unit = None
+
+    return ParsedValue(
+        raw=raw,
+        min=min(numbers) if numbers else None,
+        max=max(numbers) if numbers else None,
+        unit=unit,
+        currency=currency[1] if currency else None,
+        period_days=period_days,
+        is_free=is_free,
+        bare=bool(numbers) and not is_free and bool(_BARE.match(text)),
+        percent_min=min(percents) if percents else None,
+        percent_max=max(percents) if percents else None,
+    )
+
+
+def parse_value(value: Any) -> ParsedValue:
+    """
+    Parse a raw or normalized value into a ParsedValue.
+
+    Results are cached by text, so repeated values across banks and
+    snapshots are parsed only once.
+    """
+    if value is None:
+        return ParsedValue(raw="")
+    if isinstance(value, bool):
+        return ParsedValue(raw=str(value))
+    if isinstance(value, (int, float)):
+        number = float(value)
+        return ParsedValue(raw=str(value), min=number, max=number, bare=True)
+    return _parse_text(str(value))
@@ -0,0 +1,15 @@
+import json
+import logging
+
+from modules.validator import validate_data_directory
+
+
+def main():
+    # Проверяет все файлы configs/bank_data; неизменившиеся файлы берутся из кеша по хешу содержимого
+    logging.basicConfig(level=logging.INFO)
+    report = validate_data_directory()
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()